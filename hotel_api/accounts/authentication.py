@@ -0,0 +1,129 @@
+"""
+Cached token authentication
+
+DRF's TokenAuthentication joins Token and User on every request. Here a
+token key maps to a snapshot of the user's row, kept in two tiers: a small
+in-process LRU and the shared default cache, both with a TTL. A warm
+request authenticates without touching the database.
+
+The snapshot leaves out the password hash and reset token: the user is
+rebuilt with those fields deferred, so check_password loads them on
+demand and save() only writes the loaded fields.
+
+Deleting a token (logout) or saving its user with a changed cached field
+(role change, deactivation; not a login's last_login) drops the entry
+from the shared cache and this process's LRU, see signals.py. Other
+processes may keep serving their LRU copy for up to AUTH_TOKEN_LOCAL_TTL
+seconds; writes that skip signals (queryset.update) are picked up when the
+shared entry expires.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from .models import User
+
+SNAPSHOT_FIELDS = User.SNAPSHOT_FIELDS
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU with a per-entry expiry
+    """
+    def __init__(self, size):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_tokens = LRUCache(getattr(settings, 'AUTH_TOKEN_CACHE_SIZE', 1024))
+
+
+def token_cache_key(key):
+    # Hashed so raw tokens never land in the shared cache
+    return f"accounts:token:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def invalidate_token(key):
+    cache_key = token_cache_key(key)
+    local_tokens.pop(cache_key)
+    cache.delete(cache_key)
+
+
+def token_snapshot(token):
+    user = token.user
+    return {
+        'created': token.created,
+        'user': {field: getattr(user, field) for field in SNAPSHOT_FIELDS},
+    }
+
+
+def user_from_snapshot(data):
+    """
+    A User as if loaded from the database, with the fields left out of
+    the snapshot deferred
+    """
+    fields = [field.attname for field in User._meta.concrete_fields if field.attname in data]
+    return User.from_db(DEFAULT_DB_ALIAS, fields, [data[field] for field in fields])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication ("Authorization: Token <key>") served from the
+    token cache
+    """
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        snapshot = local_tokens.get(cache_key)
+        if snapshot is None:
+            snapshot = cache.get(cache_key)
+            if snapshot is None:
+                try:
+                    token = Token.objects.select_related('user').get(key=key)
+                except Token.DoesNotExist:
+                    raise exceptions.AuthenticationFailed(_('Invalid token.'))
+                snapshot = token_snapshot(token)
+                cache.set(cache_key, snapshot, getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 300))
+            local_tokens.set(cache_key, snapshot, getattr(settings, 'AUTH_TOKEN_LOCAL_TTL', 5))
+
+        if not snapshot['user']['is_active']:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        user = user_from_snapshot(snapshot['user'])
+        token = Token.from_db(DEFAULT_DB_ALIAS, ['key', 'user_id', 'created'], [key, user.pk, snapshot['created']])
+        token.user = user
+        return user, token
@@ -12,5 +12,28 @@ class User(AbstractUser):
     reset_token = models.CharField(max_length=32, blank=True, null=True)
     reset_token_expires = models.DateTimeField(blank=True, null=True)
 
+    # Copied into the token cache, see authentication.py
+    SNAPSHOT_FIELDS = [
+        'id', 'username', 'email', 'first_name', 'last_name', 'role',
+        'is_active', 'is_staff', 'is_superuser', 'date_joined', 'last_login',
+    ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the cached fields so saving the user only drops its tokens when they change
+        if all(field in field_names for field in cls.SNAPSHOT_FIELDS):
+            instance._loaded_snapshot = instance.snapshot_key
+        return instance
+
+    @property
+    def snapshot_key(self):
+        """Cached fields except last_login, which every login rewrites"""
+        return tuple(getattr(self, field) for field in self.SNAPSHOT_FIELDS if field != 'last_login')
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_snapshot = self.snapshot_key
+
     def __str__(self):
         return f"{self.username} ({self.role})"
@@ -0,0 +1,138 @@
+"""
+Role-based capabilities
+
+Every User.Role maps to a precomputed Capability bitmask, so a permission
+check is one bitwise AND on the authenticated user's role: no queries
+beyond authentication itself (which the token cache usually serves). The
+mask is resolved once per request and memoized on the underlying
+HttpRequest.
+
+Roles are ordered by their masks: a role "is staff" when it holds every
+capability of STAFF, which MANAGER and ADMIN do.
+"""
+import enum
+from asgiref.sync import sync_to_async
+from rest_framework import exceptions, permissions
+from .authentication import CachedTokenAuthentication
+from .models import User
+
+
+class Capability(enum.IntFlag):
+    VIEW_BOOKINGS = enum.auto()  # booking list, upcoming, exports, change feed
+    MANAGE_BOOKINGS = enum.auto()  # edit or delete any booking
+    IMPORT_BOOKINGS = enum.auto()  # bulk group imports
+    VIEW_MESSAGES = enum.auto()  # contact form inbox
+    MANAGE_ROOMS = enum.auto()
+    VIEW_ANALYTICS = enum.auto()
+    MANAGE_USERS = enum.auto()
+
+
+NO_CAPABILITIES = Capability(0)
+ALL_CAPABILITIES = ~NO_CAPABILITIES
+
+_STAFF = Capability.VIEW_BOOKINGS | Capability.MANAGE_BOOKINGS | Capability.VIEW_MESSAGES
+_MANAGER = _STAFF | Capability.IMPORT_BOOKINGS | Capability.MANAGE_ROOMS | Capability.VIEW_ANALYTICS
+
+ROLE_CAPABILITIES = {
+    User.Role.GUEST: NO_CAPABILITIES,
+    User.Role.STAFF: _STAFF,
+    User.Role.MANAGER: _MANAGER,
+    User.Role.ADMIN: ALL_CAPABILITIES,
+}
+
+
+def capabilities_for(user):
+    if not user or not user.is_authenticated:
+        return NO_CAPABILITIES
+    if user.is_superuser:
+        return ALL_CAPABILITIES
+    return ROLE_CAPABILITIES.get(user.role, NO_CAPABILITIES)
+
+
+def has_role(capabilities, role):
+    required = ROLE_CAPABILITIES[role]
+    return capabilities & required == required
+
+
+def request_capabilities(request):
+    """
+    The capability mask of the request's user, computed once per request
+    (DRF Request and the HttpRequest it wraps share the memo)
+    """
+    http_request = getattr(request, '_request', request)
+    capabilities = getattr(http_request, '_capabilities', None)
+    if capabilities is None:
+        capabilities = capabilities_for(request.user)
+        http_request._capabilities = capabilities
+    return capabilities
+
+
+def token_capabilities(request):
+    """
+    request_capabilities for plain Django views, authenticating the
+    Authorization token header the way DRF views do
+    """
+    http_request = getattr(request, '_request', request)
+    capabilities = getattr(http_request, '_capabilities', None)
+    if capabilities is None:
+        try:
+            credentials = CachedTokenAuthentication().authenticate(http_request)
+        except exceptions.AuthenticationFailed:
+            credentials = None
+        capabilities = capabilities_for(credentials[0] if credentials else None)
+        http_request._capabilities = capabilities
+    return capabilities
+
+
+atoken_capabilities = sync_to_async(token_capabilities)
+
+
+def capabilities_payload(request):
+    capabilities = request_capabilities(request)
+    return {
+        'role': request.user.role if request.user.is_authenticated else None,
+        'mask': int(capabilities),
+        'capabilities': sorted(capability.name.lower() for capability in Capability if capability in capabilities),
+        'is_staff': has_role(capabilities, User.Role.STAFF),
+        'is_manager': has_role(capabilities, User.Role.MANAGER),
+        'is_admin': has_role(capabilities, User.Role.ADMIN),
+    }
+
+
+class HasCapability(permissions.BasePermission):
+    """
+    Grants access when the user holds every bit of `required`
+    """
+    required = NO_CAPABILITIES
+
+    def has_permission(self, request, view):
+        return request_capabilities(request) & self.required == self.required
+
+
+def requires(capabilities):
+    """
+    A HasCapability subclass for `capabilities`, for permission_classes
+    """
+    return type(f'Requires{capabilities.name or int(capabilities)}', (HasCapability,), {'required': capabilities})
+
+
+class IsStaff(HasCapability):
+    required = ROLE_CAPABILITIES[User.Role.STAFF]
+
+
+class IsManager(HasCapability):
+    required = ROLE_CAPABILITIES[User.Role.MANAGER]
+
+
+class IsAdmin(HasCapability):
+    required = ROLE_CAPABILITIES[User.Role.ADMIN]
+
+
+class ActionCapabilities(HasCapability):
+    """
+    For ViewSets: `action_capabilities` maps action names to the
+    capability they need; unlisted actions stay public
+    """
+    def has_permission(self, request, view):
+        required = getattr(view, 'action_capabilities', {}).get(view.action, NO_CAPABILITIES)
+        return request_capabilities(request) & required == required
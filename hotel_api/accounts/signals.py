@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .authentication import invalidate_token
+from .models import User
+
+
+def drop_cached_token(key):
+    # Now and again after commit, so a request that reads the row before
+    # the transaction commits cannot re-cache the old snapshot
+    invalidate_token(key)
+    transaction.on_commit(lambda: invalidate_token(key))
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    drop_cached_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # A new user has no tokens yet; a login only writes last_login
+    if created or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    # Role, is_active and profile changes all live in the cached snapshot
+    if getattr(instance, '_loaded_snapshot', None) == instance.snapshot_key:
+        return
+    for key in Token.objects.filter(user_id=instance.pk).values_list('key', flat=True):
+        drop_cached_token(key)
@@ -1,3 +1,121 @@
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from .authentication import CachedTokenAuthentication, token_cache_key
+from .models import User
 
-# Create your tests here.
+
+class TokenCacheInvalidationTests(TestCase):
+    """Saving a user drops its cached tokens only when a cached field changed"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='hospede', email='hospede@example.com', password='senha-forte-123')
+        self.token = Token.objects.create(user=self.user)
+        self.cache_key = token_cache_key(self.token.key)
+
+    def authenticate(self):
+        return CachedTokenAuthentication().authenticate_credentials(self.token.key)[0]
+
+    def test_login_keeps_cached_token(self):
+        self.authenticate()
+
+        update_last_login(None, User.objects.get(pk=self.user.pk))
+        self.assertIsNotNone(cache.get(self.cache_key))
+
+    def test_save_without_changes_keeps_cached_token(self):
+        self.authenticate()
+
+        User.objects.get(pk=self.user.pk).save()
+        self.authenticate().save()
+        self.assertIsNotNone(cache.get(self.cache_key))
+
+    def test_role_change_drops_cached_token(self):
+        self.authenticate()
+
+        user = User.objects.get(pk=self.user.pk)
+        user.role = User.Role.STAFF
+        user.save()
+        self.assertIsNone(cache.get(self.cache_key))
+        self.assertEqual(self.authenticate().role, User.Role.STAFF)
+
+    def test_deactivating_a_cached_user_drops_its_token(self):
+        user = self.authenticate()
+
+        user.is_active = False
+        user.save(update_fields=['is_active', 'last_login'])
+        self.assertIsNone(cache.get(self.cache_key))
+
+
+class CapabilityTests(TestCase):
+    """Server-side role checks on the staff and manager endpoints"""
+
+    def setUp(self):
+        cache.clear()
+
+    def client_for(self, role):
+        client = APIClient()
+        if role:
+            user = User.objects.create_user(username=role.lower(), email=f'{role.lower()}@example.com',
+                                            password='senha-forte-123', role=role)
+            client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}')
+        return client
+
+    def request(self, client, endpoint):
+        if endpoint == 'bulk':
+            return client.post('/api/bookings/bulk/', {'bookings': [{}]}, format='json')
+        return client.get(endpoint)
+
+    def test_anonymous_requests_are_unauthenticated(self):
+        client = self.client_for(None)
+        for endpoint in ['/api/bookings/', '/api/bookings/export/', '/api/bookings/changes/', 'bulk']:
+            self.assertEqual(self.request(client, endpoint).status_code, 401, endpoint)
+
+    def test_guests_are_forbidden(self):
+        client = self.client_for(User.Role.GUEST)
+        for endpoint in ['/api/bookings/', '/api/bookings/export/', '/api/bookings/changes/', 'bulk',
+                         '/api/analytics/performance/']:
+            self.assertEqual(self.request(client, endpoint).status_code, 403, endpoint)
+
+    def test_staff_reads_bookings_but_not_imports_or_analytics(self):
+        client = self.client_for(User.Role.STAFF)
+
+        self.assertEqual(client.get('/api/bookings/').status_code, 200)
+        self.assertEqual(client.get('/api/bookings/changes/').status_code, 200)
+        self.assertEqual(self.request(client, 'bulk').status_code, 403)
+        self.assertEqual(client.get('/api/analytics/performance/').status_code, 403)
+        self.assertEqual(client.get('/api/analytics/pace/').status_code, 403)
+
+    def test_manager_imports_and_reads_analytics(self):
+        client = self.client_for(User.Role.MANAGER)
+
+        # Reaches import_bookings, which rejects the empty row
+        response = self.request(client, 'bulk')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][0]['row'], 0)
+        self.assertEqual(client.get('/api/analytics/performance/').status_code, 200)
+        self.assertEqual(client.get('/api/analytics/pace/').status_code, 200)
+
+    def test_capabilities_payload(self):
+        self.assertEqual(self.client_for(None).get('/api/auth/auth/capabilities/').json(), {
+            'role': None, 'mask': 0, 'capabilities': [],
+            'is_staff': False, 'is_manager': False, 'is_admin': False,
+        })
+        self.assertEqual(self.client_for(User.Role.STAFF).get('/api/auth/auth/capabilities/').json(), {
+            'role': 'STAFF', 'mask': 11, 'capabilities': ['manage_bookings', 'view_bookings', 'view_messages'],
+            'is_staff': True, 'is_manager': False, 'is_admin': False,
+        })
+        payload = self.client_for(User.Role.ADMIN).get('/api/auth/auth/capabilities/').json()
+        self.assertEqual(len(payload['capabilities']), 7)
+        self.assertTrue(payload['is_staff'] and payload['is_manager'] and payload['is_admin'])
+
+    def test_checks_add_no_queries(self):
+        client = self.client_for(User.Role.STAFF)
+        client.get('/api/auth/auth/capabilities/')  # warms the token cache
+
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get('/api/auth/auth/capabilities/').status_code, 200)
+            self.assertEqual(client.get('/api/analytics/performance/').status_code, 403)
+            self.assertEqual(self.request(client, 'bulk').status_code, 403)
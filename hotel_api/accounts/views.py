@@ -1,20 +1,24 @@
 from rest_framework import status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
-from django.core.mail import send_mail
 from django.conf import settings
 from django.utils.crypto import get_random_string
 from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
 from datetime import timedelta
 from .serializers import UserSerializer, LoginSerializer, RegisterSerializer, ChangePasswordSerializer, ForgotPasswordSerializer, ResetPasswordSerializer
 from .models import User
+from .permissions import capabilities_payload
+from notifications.outbox import enqueue_email
+from hotel_api.throttling import throttle
 
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([throttle('login')])
 def login_view(request):
     """Login user and return token"""
     serializer = LoginSerializer(data=request.data)
@@ -36,6 +40,7 @@ def login_view(request):
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([throttle('register')])
 def register_view(request):
     """Register new user"""
     serializer = RegisterSerializer(data=request.data)
@@ -111,16 +116,24 @@ def check_auth(request):
 @permission_classes([permissions.IsAuthenticated])
 def get_user_role(request):
     """Get user role for frontend routing"""
-    return Response({
-        'role': request.user.role,
-        'is_admin': request.user.role == User.Role.ADMIN,
-        'is_staff': request.user.role in [User.Role.STAFF, User.Role.MANAGER, User.Role.ADMIN],
-        'is_manager': request.user.role in [User.Role.MANAGER, User.Role.ADMIN],
-    })
+    payload = capabilities_payload(request)
+    return Response({key: payload[key] for key in ('role', 'is_admin', 'is_staff', 'is_manager')})
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def capabilities(request):
+    """Role, role flags and capabilities of the current user (anonymous users get none)"""
+    response = Response(capabilities_payload(request))
+    # Per user: the frontend may reuse it for as long as the token cache would
+    patch_cache_control(response, private=True, max_age=getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 300))
+    patch_vary_headers(response, ['Authorization', 'Cookie'])
+    return response
 
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([throttle('forgot_password')])
 def forgot_password(request):
     """Send password reset email"""
     serializer = ForgotPasswordSerializer(data=request.data)
@@ -156,14 +169,9 @@ def forgot_password(request):
         Equipe Hotel Jan
         """
         
+        # Queue email; the send_queued_emails worker delivers it
         try:
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [email],
-                fail_silently=False,
-            )
+            enqueue_email(subject, email, body=message)
             return Response({
                 'message': 'Password reset email sent successfully'
             }, status=status.HTTP_200_OK)
@@ -177,6 +185,7 @@ def forgot_password(request):
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([throttle('reset_password')])
 def reset_password(request):
     """Reset password using token"""
     serializer = ResetPasswordSerializer(data=request.data)
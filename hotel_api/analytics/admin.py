@@ -0,0 +1,16 @@
+from django.contrib import admin
+from .models import DailyRoomStat, DailyBookingStat
+
+
+@admin.register(DailyRoomStat)
+class DailyRoomStatAdmin(admin.ModelAdmin):
+    list_display = ['day', 'room', 'room_type', 'revenue']
+    list_filter = ['room_type']
+    date_hierarchy = 'day'
+
+
+@admin.register(DailyBookingStat)
+class DailyBookingStatAdmin(admin.ModelAdmin):
+    list_display = ['day', 'room_type', 'bookings', 'cancellations', 'room_nights', 'revenue']
+    list_filter = ['room_type']
+    date_hierarchy = 'day'
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('rooms', '0002_roomimage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBookingStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('room_type', models.CharField(max_length=20)),
+                ('bookings', models.PositiveIntegerField(default=0)),
+                ('cancellations', models.PositiveIntegerField(default=0)),
+                ('room_nights', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+            ],
+            options={
+                'ordering': ['day', 'room_type'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'room_type'), name='unique_daily_booking_stat')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRoomStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('room_type', models.CharField(max_length=20)),
+                ('revenue', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='rooms.room')),
+            ],
+            options={
+                'ordering': ['day', 'room'],
+                'indexes': [models.Index(fields=['day', 'room_type'], name='daily_room_stat_type_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'room'), name='unique_daily_room_stat')],
+            },
+        ),
+    ]
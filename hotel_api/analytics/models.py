@@ -0,0 +1,59 @@
+from django.db import models
+from rooms.models import Room
+
+
+class DailyRoomStat(models.Model):
+    """
+    Rollup: one row per occupied room-night, with the share of the
+    booking's total price earned that night. Rebuilt by analytics.rollups.
+    """
+    day = models.DateField()
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name="daily_stats")
+    room_type = models.CharField(max_length=20)
+    revenue = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        ordering = ['day', 'room']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'room'], name='unique_daily_room_stat'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'room_type'], name='daily_room_stat_type_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.room_id} {self.day}: {self.revenue}"
+
+
+class DailyBookingStat(models.Model):
+    """
+    Rollup: bookings made per day (by creation date) and room type,
+    used for booking pace
+    """
+    day = models.DateField()
+    room_type = models.CharField(max_length=20)
+    bookings = models.PositiveIntegerField(default=0)
+    cancellations = models.PositiveIntegerField(default=0)
+    room_nights = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ['day', 'room_type']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'room_type'], name='unique_daily_booking_stat'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.room_type}: {self.bookings}"
+
+
+class RollupWatermark(models.Model):
+    """
+    Last booking change (BookingChange id) already folded into the rollups
+    """
+    name = models.CharField(max_length=50, unique=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.position}"
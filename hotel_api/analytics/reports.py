@@ -0,0 +1,146 @@
+"""
+Dashboard reports computed from the daily rollups
+
+Every query aggregates DailyRoomStat / DailyBookingStat in the database,
+grouped by day, ISO week (starting Monday) or month.
+"""
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import Trunc
+from rooms.models import Room
+from .models import DailyRoomStat, DailyBookingStat
+
+GRANULARITIES = ('day', 'week', 'month')
+CENT = Decimal('0.01')
+
+
+def period_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def period_days(start, end, granularity):
+    """
+    {period start: number of days of that period inside [start, end)}, in order
+    """
+    days = Counter()
+    day = start
+    while day < end:
+        days[period_start(day, granularity)] += 1
+        day += timedelta(days=1)
+    return dict(sorted(days.items()))
+
+
+def money(value):
+    return str(Decimal(value).quantize(CENT))
+
+
+def kpis(room_nights, revenue, available):
+    """
+    Occupancy rate (%), ADR (revenue per occupied room-night) and RevPAR
+    (revenue per available room-night)
+    """
+    revenue = revenue or Decimal(0)
+    return {
+        'room_nights': room_nights,
+        'available_room_nights': available,
+        'occupancy_rate': round(room_nights * 100 / available, 2) if available else 0.0,
+        'revenue': money(revenue),
+        'adr': money(revenue / room_nights) if room_nights else money(0),
+        'revpar': money(revenue / available) if available else money(0),
+    }
+
+
+def performance(start, end, granularity='day', room_type=None):
+    """
+    Occupancy, ADR, RevPAR and revenue for the nights in [start, end),
+    per period and per room type
+    """
+    rooms = Room.objects.all()
+    stats = DailyRoomStat.objects.filter(day__gte=start, day__lt=end)
+    if room_type:
+        rooms = rooms.filter(room_type=room_type)
+        stats = stats.filter(room_type=room_type)
+
+    rooms_by_type = dict(rooms.order_by().values_list('room_type').annotate(count=Count('id')))
+    room_count = sum(rooms_by_type.values())
+    days = period_days(start, end, granularity)
+    total_days = sum(days.values())
+
+    by_period = {
+        row['period']: row
+        for row in stats.annotate(period=Trunc('day', granularity, output_field=DateField()))
+        .values('period').annotate(room_nights=Count('id'), revenue=Sum('revenue')).order_by()
+    }
+    by_type = {
+        row['room_type']: row
+        for row in stats.values('room_type').annotate(room_nights=Count('id'), revenue=Sum('revenue')).order_by()
+    }
+    totals = stats.aggregate(room_nights=Count('id'), revenue=Sum('revenue'))
+
+    periods = []
+    for period, period_length in days.items():
+        row = by_period.get(period, {})
+        periods.append({
+            'period': str(period),
+            **kpis(row.get('room_nights', 0), row.get('revenue'), room_count * period_length),
+        })
+
+    room_types = []
+    for key in sorted(set(rooms_by_type) | set(by_type)):
+        row = by_type.get(key, {})
+        room_types.append({
+            'room_type': key,
+            'rooms': rooms_by_type.get(key, 0),
+            **kpis(row.get('room_nights', 0), row.get('revenue'), rooms_by_type.get(key, 0) * total_days),
+        })
+
+    return {
+        'rooms': room_count,
+        'totals': kpis(totals['room_nights'], totals['revenue'], room_count * total_days),
+        'periods': periods,
+        'by_room_type': room_types,
+    }
+
+
+def pace(start, end, granularity='day', room_type=None):
+    """
+    Bookings made per period (by creation date) for [start, end)
+    """
+    stats = DailyBookingStat.objects.filter(day__gte=start, day__lt=end)
+    if room_type:
+        stats = stats.filter(room_type=room_type)
+
+    sums = {
+        'bookings': Sum('bookings'),
+        'cancellations': Sum('cancellations'),
+        'room_nights': Sum('room_nights'),
+        'revenue': Sum('revenue'),
+    }
+    by_period = {
+        row['period']: row
+        for row in stats.annotate(period=Trunc('day', granularity, output_field=DateField()))
+        .values('period').annotate(**sums).order_by()
+    }
+    totals = stats.aggregate(**sums)
+
+    def pace_row(row):
+        return {
+            'bookings': row.get('bookings') or 0,
+            'cancellations': row.get('cancellations') or 0,
+            'room_nights': row.get('room_nights') or 0,
+            'revenue': money(row.get('revenue') or 0),
+        }
+
+    return {
+        'totals': pace_row(totals),
+        'periods': [
+            {'period': str(period), **pace_row(by_period.get(period, {}))}
+            for period in period_days(start, end, granularity)
+        ],
+    }
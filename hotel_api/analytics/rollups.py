@@ -0,0 +1,242 @@
+"""
+Daily rollup maintenance
+
+DailyRoomStat and DailyBookingStat are derived from bookings only. A
+refresh recomputes whole buckets (a day range, optionally limited to some
+rooms) in one transaction: delete the bucket's rows, then insert them
+again, so running it twice never double counts.
+
+Incremental runs follow the booking change feed: the watermark is the
+last BookingChange id already applied. Unlike Booking.updated_at, the feed
+also sees deletions and the room and dates a booking held before a move.
+"""
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal, ROUND_DOWN
+from multiprocessing import get_context
+from django.db import connections, transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from bookings.availability import merge_intervals
+from bookings.changes import latest_seq, settled
+from bookings.models import Booking, BookingChange
+from .models import DailyRoomStat, DailyBookingStat, RollupWatermark
+
+CENT = Decimal('0.01')
+WATERMARK = 'rollups'
+
+
+def nightly_revenue(total, nights):
+    """
+    Split a stay's total price over its nights; the first night takes
+    the rounding remainder so the shares add up to the total
+    """
+    share = (total / nights).quantize(CENT, rounding=ROUND_DOWN)
+    return [total - share * (nights - 1)] + [share] * (nights - 1)
+
+
+def room_stat_rows(start, end, room_ids=None):
+    """
+    DailyRoomStat rows for the nights in [start, end) of every booking
+    that holds them (cancelled bookings hold no nights)
+    """
+    bookings = Booking.objects.overlapping(start, end).order_by()
+    if room_ids is not None:
+        bookings = bookings.filter(room_id__in=room_ids)
+
+    rows = []
+    for booking in bookings.values('room_id', 'room__room_type', 'check_in', 'check_out', 'total_price'):
+        nights = (booking['check_out'] - booking['check_in']).days
+        if nights <= 0:
+            continue
+        for offset, revenue in enumerate(nightly_revenue(booking['total_price'], nights)):
+            day = booking['check_in'] + timedelta(days=offset)
+            if start <= day < end:
+                rows.append(DailyRoomStat(
+                    day=day, room_id=booking['room_id'], room_type=booking['room__room_type'], revenue=revenue
+                ))
+    return rows
+
+
+def refresh_room_stats(start, end, room_ids=None):
+    """
+    Rebuild DailyRoomStat for the nights in [start, end), optionally only
+    for some rooms. Returns the number of rows written.
+    """
+    with transaction.atomic():
+        stale = DailyRoomStat.objects.filter(day__gte=start, day__lt=end)
+        if room_ids is not None:
+            stale = stale.filter(room_id__in=room_ids)
+        stale.delete()
+        rows = room_stat_rows(start, end, room_ids)
+        DailyRoomStat.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+    return len(rows)
+
+
+def refresh_booking_stats(start, end):
+    """
+    Rebuild DailyBookingStat for bookings created on the days in
+    [start, end). Returns the number of rows written.
+    """
+    occupying = ~Q(status='cancelled')
+    groups = (
+        Booking.objects.annotate(day=TruncDate('created_at'))
+        .filter(day__gte=start, day__lt=end)
+        .values('day', 'room__room_type')
+        .annotate(
+            bookings=Count('id'),
+            cancellations=Count('id', filter=Q(status='cancelled')),
+            room_nights=Sum(F('check_out') - F('check_in'), filter=occupying),
+            revenue=Sum('total_price', filter=occupying),
+        )
+        .order_by()
+    )
+    rows = [
+        DailyBookingStat(
+            day=group['day'],
+            room_type=group['room__room_type'],
+            bookings=group['bookings'],
+            cancellations=group['cancellations'],
+            room_nights=group['room_nights'].days if group['room_nights'] else 0,
+            revenue=group['revenue'] or 0,
+        )
+        for group in groups
+    ]
+    with transaction.atomic():
+        DailyBookingStat.objects.filter(day__gte=start, day__lt=end).delete()
+        DailyBookingStat.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def booking_date_range():
+    """
+    (first, last) day any rollup row can fall on, or None without bookings
+    """
+    bounds = Booking.objects.aggregate(
+        first_night=Min('check_in'), last_night=Max('check_out'),
+        first_created=Min('created_at'), last_created=Max('created_at'),
+    )
+    if bounds['first_night'] is None:
+        return None
+    return (
+        min(bounds['first_night'], timezone.localtime(bounds['first_created']).date()),
+        max(bounds['last_night'], timezone.localtime(bounds['last_created']).date() + timedelta(days=1)),
+    )
+
+
+def month_partitions(start, end):
+    """
+    Split [start, end) into calendar-month ranges
+    """
+    partitions = []
+    while start < end:
+        next_month = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        partitions.append((start, min(next_month, end)))
+        start = next_month
+    return partitions
+
+
+def refresh_partition(bounds):
+    start, end = bounds
+    return refresh_room_stats(start, end), refresh_booking_stats(start, end)
+
+
+def refresh_range(start, end, workers=1):
+    """
+    Rebuild both rollups for [start, end), one month partition per
+    transaction, spread over `workers` processes when above 1.
+    Returns (room rows, booking rows).
+    """
+    partitions = month_partitions(start, end)
+    if workers > 1 and len(partitions) > 1:
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('fork')) as pool:
+            results = list(pool.map(refresh_partition, partitions))
+    else:
+        results = [refresh_partition(partition) for partition in partitions]
+    return sum(r[0] for r in results), sum(r[1] for r in results)
+
+
+def get_watermark():
+    watermark, _ = RollupWatermark.objects.get_or_create(name=WATERMARK)
+    return watermark.position
+
+
+def set_watermark(position):
+    RollupWatermark.objects.update_or_create(name=WATERMARK, defaults={'position': position})
+
+
+def refresh_full(workers=1):
+    """
+    Rebuild both rollups from scratch and move the watermark to the
+    latest booking change. Returns (room rows, booking rows).
+    """
+    # Read first: changes committed during the rebuild are replayed by the next incremental run
+    position = latest_seq()
+    bounds = booking_date_range()
+    if bounds is None:
+        DailyRoomStat.objects.all().delete()
+        DailyBookingStat.objects.all().delete()
+        counts = (0, 0)
+    else:
+        start, end = bounds
+        DailyRoomStat.objects.exclude(day__gte=start, day__lt=end).delete()
+        DailyBookingStat.objects.exclude(day__gte=start, day__lt=end).delete()
+        counts = refresh_range(start, end, workers)
+    set_watermark(position)
+    return counts
+
+
+def touched_buckets(changes):
+    """
+    Buckets a batch of booking changes can affect: merged night ranges
+    per room (before and after each change) and booking creation days
+    """
+    stays = defaultdict(list)
+    created_days = set()
+    for change in changes:
+        data = change.data
+        stays[data['room_id']].append(
+            (date.fromisoformat(str(data['check_in'])), date.fromisoformat(str(data['check_out'])))
+        )
+        if change.previous:
+            previous = change.previous
+            stays[previous['room']].append(
+                (date.fromisoformat(str(previous['check_in'])), date.fromisoformat(str(previous['check_out'])))
+            )
+        created_at = data['created_at']
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        created_days.add(timezone.localtime(created_at).date())
+
+    room_ranges = {room_id: merge_intervals(ranges) for room_id, ranges in stays.items()}
+    day_ranges = merge_intervals((day, day + timedelta(days=1)) for day in created_days)
+    return room_ranges, day_ranges
+
+
+def refresh_incremental(batch_size=1000):
+    """
+    Fold booking changes recorded after the watermark into the rollups,
+    recomputing only the room/day and creation-day buckets they touch.
+    Each batch and its watermark move commit together. Returns the number
+    of changes processed.
+    """
+    processed = 0
+    while True:
+        with transaction.atomic():
+            position = get_watermark()
+            changes = list(settled(BookingChange.objects.filter(id__gt=position)).order_by('id')[:batch_size])
+            if not changes:
+                return processed
+
+            room_ranges, day_ranges = touched_buckets(changes)
+            for room_id, ranges in room_ranges.items():
+                for start, end in ranges:
+                    refresh_room_stats(start, end, [room_id])
+            for start, end in day_ranges:
+                refresh_booking_stats(start, end)
+            set_watermark(changes[-1].id)
+        processed += len(changes)
@@ -0,0 +1,62 @@
+import logging
+import threading
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from bookings.models import Booking, BookingChange
+from bookings.signals import bookings_bulk_created
+from .rollups import get_watermark, refresh_incremental
+
+logger = logging.getLogger(__name__)
+
+_scheduled = False
+_scheduled_lock = threading.Lock()
+
+
+def refresh_when_settled():
+    """
+    Run refresh_incremental once the write that just committed is settled
+    (CHANGE_FEED_SETTLE, see bookings/changes.py). One timer per process at
+    a time: it repeats while changes past the watermark remain, so writes made
+    while it waits are folded in too.
+    """
+    global _scheduled
+    with _scheduled_lock:
+        if _scheduled:
+            return
+        _scheduled = True
+    timer = threading.Timer(settings.CHANGE_FEED_SETTLE + 1, _refresh_settled)
+    timer.daemon = True
+    timer.start()
+
+
+def _refresh_settled():
+    global _scheduled
+    try:
+        refresh_incremental()
+        pending = BookingChange.objects.filter(id__gt=get_watermark()).exists()
+    except Exception:
+        logger.exception("Analytics rollup refresh failed")
+        pending = False
+    finally:
+        # This timer thread's own connection
+        connection.close()
+        with _scheduled_lock:
+            _scheduled = False
+    if pending:
+        refresh_when_settled()
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+@receiver(bookings_bulk_created, sender=Booking)
+def refresh_rollups(sender, **kwargs):
+    # Off by default: run `refresh_analytics` from cron instead of on every write
+    if not getattr(settings, 'ANALYTICS_REFRESH_ON_COMMIT', False):
+        return
+    if getattr(settings, 'CHANGE_FEED_SETTLE', 0):
+        # The change is held back from refresh_incremental until it settles
+        transaction.on_commit(refresh_when_settled)
+    else:
+        transaction.on_commit(refresh_incremental, robust=True)
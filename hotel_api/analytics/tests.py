@@ -0,0 +1,171 @@
+import threading
+from io import StringIO
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from bookings.models import Booking, BookingChange
+from rooms.models import Room
+from . import signals
+from .models import DailyRoomStat, DailyBookingStat
+from .reports import performance
+from .rollups import get_watermark, nightly_revenue, refresh_full, refresh_incremental
+
+START = date(2030, 1, 10)
+
+
+def room_stats():
+    return list(DailyRoomStat.objects.order_by('day', 'room_id').values_list('room_id', 'day', 'revenue'))
+
+
+def booking_stats():
+    return list(DailyBookingStat.objects.order_by('day', 'room_type').values_list(
+        'room_type', 'bookings', 'cancellations', 'room_nights', 'revenue'
+    ))
+
+
+class RollupFixture:
+
+    def setUp(self):
+        self.standard = Room.objects.create(name="Quarto 1", room_type="standard", description="Teste", price_per_night=100)
+        self.deluxe = Room.objects.create(name="Quarto 2", room_type="deluxe", description="Teste", price_per_night=200)
+
+    def book(self, room, check_in, nights, total, **fields):
+        return Booking.objects.create(
+            room=room, name='Hóspede', email='a@example.com', check_in=check_in,
+            check_out=check_in + timedelta(days=nights), total_price=Decimal(total), status='confirmed', **fields
+        )
+
+
+class NightlyRevenueTests(TestCase):
+
+    def test_shares_add_up_to_the_total(self):
+        self.assertEqual(nightly_revenue(Decimal('100.00'), 3), [Decimal('33.34'), Decimal('33.33'), Decimal('33.33')])
+        for total, nights in [('0.01', 3), ('999.99', 7), ('150000.00', 1), ('10.00', 4)]:
+            shares = nightly_revenue(Decimal(total), nights)
+            self.assertEqual(len(shares), nights)
+            self.assertEqual(sum(shares), Decimal(total))
+
+
+@override_settings(CHANGE_FEED_SETTLE=0)
+class IncrementalRefreshTests(RollupFixture, TestCase):
+
+    def test_move_cancel_and_delete(self):
+        booking = self.book(self.standard, START, 3, '300.00')
+        refresh_incremental()
+        self.assertEqual(room_stats(), [(self.standard.id, START + timedelta(days=i), Decimal('100.00')) for i in range(3)])
+
+        # Moved to another room and later dates: the old nights are emptied
+        booking.room = self.deluxe
+        booking.check_in, booking.check_out = START + timedelta(days=5), START + timedelta(days=7)
+        booking.save()
+        refresh_incremental()
+        self.assertEqual(room_stats(), [
+            (self.deluxe.id, START + timedelta(days=5), Decimal('150.00')),
+            (self.deluxe.id, START + timedelta(days=6), Decimal('150.00')),
+        ])
+        self.assertEqual(booking_stats(), [('deluxe', 1, 0, 2, Decimal('300.00'))])
+
+        booking.status = 'cancelled'
+        booking.save()
+        refresh_incremental()
+        self.assertEqual(room_stats(), [])
+        self.assertEqual(booking_stats(), [('deluxe', 1, 1, 0, Decimal('0.00'))])
+
+        booking.delete()
+        refresh_incremental()
+        self.assertEqual(booking_stats(), [])
+
+    def test_watermark_advances_and_reruns_change_nothing(self):
+        self.book(self.standard, START, 2, '200.00')
+        self.book(self.deluxe, START + timedelta(days=30), 3, '600.00')
+
+        self.assertEqual(refresh_incremental(batch_size=1), 2)
+        self.assertEqual(get_watermark(), BookingChange.objects.latest('id').id)
+        incremental = (room_stats(), booking_stats())
+
+        self.assertEqual(refresh_incremental(), 0)
+        self.assertEqual((room_stats(), booking_stats()), incremental)
+        # A rebuild from scratch agrees, and running it twice does not double count
+        for _ in range(2):
+            refresh_full()
+            self.assertEqual((room_stats(), booking_stats()), incremental)
+        self.assertEqual(len(incremental[0]), 5)
+
+
+class PerformanceReportTests(RollupFixture, TestCase):
+
+    def test_kpis(self):
+        self.book(self.standard, START, 3, '300.00')
+        self.book(self.deluxe, START + timedelta(days=8), 4, '800.00')
+        refresh_full()
+
+        # 10 nights x 2 rooms; the deluxe stay runs 2 nights past the window
+        report = performance(START, START + timedelta(days=10), 'month')
+
+        self.assertEqual(report['rooms'], 2)
+        self.assertEqual(report['totals'], {
+            'room_nights': 5, 'available_room_nights': 20, 'occupancy_rate': 25.0,
+            'revenue': '700.00', 'adr': '140.00', 'revpar': '35.00',
+        })
+        self.assertEqual(report['periods'], [{'period': '2030-01-01', **report['totals']}])
+        deluxe, standard = report['by_room_type']
+        self.assertEqual((deluxe['room_type'], deluxe['occupancy_rate'], deluxe['adr'], deluxe['revpar']),
+                         ('deluxe', 20.0, '200.00', '40.00'))
+        self.assertEqual((standard['room_type'], standard['occupancy_rate'], standard['adr'], standard['revpar']),
+                         ('standard', 30.0, '100.00', '30.00'))
+
+    def test_empty_window(self):
+        report = performance(START, START + timedelta(days=7), 'week')
+        self.assertEqual(report['totals']['occupancy_rate'], 0.0)
+        self.assertEqual(report['totals']['adr'], '0.00')
+        # 2030-01-10 is a Thursday: two partial ISO weeks
+        self.assertEqual([(p['period'], p['available_room_nights']) for p in report['periods']],
+                         [('2030-01-07', 8), ('2030-01-14', 6)])
+
+
+class ParallelRebuildTests(RollupFixture, TransactionTestCase):
+    """Forked workers read committed data, hence TransactionTestCase"""
+
+    def test_full_rebuild_with_workers_matches_serial(self):
+        for month in range(4):
+            self.book(self.standard, START + timedelta(days=31 * month), 3, '250.00')
+            self.book(self.deluxe, START + timedelta(days=31 * month + 20), 15, '1500.00')
+
+        call_command('refresh_analytics', '--full', stdout=StringIO())
+        serial = (room_stats(), booking_stats())
+        DailyRoomStat.objects.all().delete()
+        DailyBookingStat.objects.all().delete()
+
+        call_command('refresh_analytics', '--full', '--workers', '2', stdout=StringIO())
+        self.assertEqual((room_stats(), booking_stats()), serial)
+        self.assertEqual(len(serial[0]), 4 * 3 + 4 * 15)
+
+
+@override_settings(ANALYTICS_REFRESH_ON_COMMIT=True)
+class RefreshOnCommitTests(RollupFixture, TransactionTestCase):
+
+    @override_settings(CHANGE_FEED_SETTLE=0)
+    def test_refreshes_after_commit(self):
+        self.book(self.standard, START, 2, '200.00')
+        self.assertEqual(len(room_stats()), 2)
+
+    @override_settings(CHANGE_FEED_SETTLE=5)
+    def test_waits_for_the_write_to_settle(self):
+        with mock.patch('analytics.signals.threading.Timer') as timer:
+            self.book(self.standard, START, 2, '200.00')
+            self.book(self.standard, START + timedelta(days=5), 2, '200.00')
+        # One timer for both writes, fired after the settle delay
+        timer.assert_called_once()
+        delay, refresh = timer.call_args.args
+        self.assertGreater(delay, 5)
+        self.assertEqual(room_stats(), [])
+
+        BookingChange.objects.update(created_at=timezone.now() - timedelta(seconds=6))
+        worker = threading.Thread(target=refresh)
+        worker.start()
+        worker.join()
+        self.assertEqual(len(room_stats()), 4)
+        self.assertFalse(signals._scheduled)
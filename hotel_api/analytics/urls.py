@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('analytics/performance/', views.performance_report, name='analytics-performance'),
+    path('analytics/pace/', views.pace_report, name='analytics-pace'),
+]
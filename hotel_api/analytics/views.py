@@ -0,0 +1,75 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from datetime import datetime, date, timedelta
+from accounts.permissions import Capability, requires
+from .reports import GRANULARITIES, performance, pace
+
+MAX_DAYS = 1096
+
+
+def parse_day(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError('Dates must use the YYYY-MM-DD format')
+
+
+def report_window(params):
+    """
+    Parse start_date / end_date (inclusive, default: current month) and
+    granularity. Returns (start, end exclusive, granularity) or raises ValueError.
+    """
+    today = date.today()
+    if params.get('start_date'):
+        start = parse_day(params['start_date'])
+    else:
+        start = today.replace(day=1)
+    if params.get('end_date'):
+        end = parse_day(params['end_date']) + timedelta(days=1)
+    else:
+        end = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+    granularity = params.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    if not 1 <= (end - start).days <= MAX_DAYS:
+        raise ValueError(f"end_date must be on or after start_date and at most {MAX_DAYS} days later")
+    return start, end, granularity
+
+
+def report_response(params, report):
+    try:
+        start, end, granularity = report_window(params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'start_date': str(start),
+        'end_date': str(end - timedelta(days=1)),
+        'granularity': granularity,
+        'room_type': params.get('room_type'),
+        **report(start, end, granularity, params.get('room_type')),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([requires(Capability.VIEW_ANALYTICS)])
+def performance_report(request):
+    """
+    Occupancy rate, ADR, RevPAR and revenue by period and room type
+    Query params: start_date, end_date (inclusive, default current month),
+    granularity (day, week or month), room_type (optional)
+    """
+    return report_response(request.query_params, performance)
+
+
+@api_view(['GET'])
+@permission_classes([requires(Capability.VIEW_ANALYTICS)])
+def pace_report(request):
+    """
+    Booking pace: bookings, cancellations, room-nights and revenue booked per period
+    Query params: start_date, end_date (inclusive, default current month),
+    granularity (day, week or month), room_type (optional)
+    """
+    return report_response(request.query_params, pace)
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class AriConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'ari'
+    verbose_name = 'Availability, rates and inventory'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,79 @@
+"""
+ARI (availability, rates, inventory) matrix for channel managers
+
+Each room gets one array per measure covering [start, end): `available`
+(1 free, 0 sold) and `rates` (final nightly rate). The whole matrix costs
+a fixed number of queries: occupied nights, rate plans and calendars.
+"""
+from collections import defaultdict
+from django.db.models import Max
+from bookings.availability import merge_intervals, clip_intervals
+from bookings.changes import settled
+from bookings.models import RoomNight
+from pricing.engine import active_plans, load_calendars, stay_rates
+from .models import AriChange
+
+
+def current_version():
+    # Settled (see bookings/changes.py) so no change below it can commit later;
+    # changed_ranges may also return younger changes, which is harmless
+    return settled(AriChange.objects).aggregate(version=Max('id'))['version'] or 0
+
+
+def changed_ranges(rooms, start, end, since):
+    """
+    {room_id: merged [start, end) ranges} touched by changes after `since`
+    """
+    rooms_by_type = defaultdict(list)
+    for room in rooms:
+        rooms_by_type[room.room_type].append(room.id)
+
+    ranges = defaultdict(list)
+    for change in AriChange.objects.filter(id__gt=since).iterator():
+        room_ids = [change.room_id] if change.room_id else rooms_by_type.get(change.room_type, [])
+        for room_id in room_ids:
+            ranges[room_id].append((change.start or start, change.end or end))
+
+    return {
+        room_id: clip_intervals(merge_intervals(intervals), start, end)
+        for room_id, intervals in ranges.items()
+    }
+
+
+def ari_rows(rooms, start, end, since=None):
+    """
+    Yield one dict per room. With `since`, only rooms with changes are
+    yielded, each with `segments` holding just the changed cells.
+    """
+    rooms = list(rooms)
+    occupied = defaultdict(set)
+    nights = RoomNight.objects.filter(room__in=rooms, night__gte=start, night__lt=end)
+    for room_id, night in nights.order_by().values_list('room_id', 'night').iterator():
+        occupied[room_id].add((night - start).days)
+
+    plans = active_plans(room.room_type for room in rooms)
+    calendars = load_calendars(plans.values(), start, end)
+    ranges = changed_ranges(rooms, start, end, since) if since is not None else None
+
+    days = (end - start).days
+    for room in rooms:
+        if ranges is not None and not ranges.get(room.id):
+            continue
+        taken = occupied[room.id]
+        available = [0 if day in taken else 1 for day in range(days)]
+        rates = [str(rate) for rate in stay_rates(room, plans.get(room.room_type), calendars, start, end)]
+
+        row = {'room_id': room.id, 'room_type': room.room_type}
+        if ranges is None:
+            row['available'] = available
+            row['rates'] = rates
+        else:
+            row['segments'] = []
+            for segment_start, segment_end in ranges[room.id]:
+                first, last = (segment_start - start).days, (segment_end - start).days
+                row['segments'].append({
+                    'start': str(segment_start),
+                    'available': available[first:last],
+                    'rates': rates[first:last],
+                })
+        yield row
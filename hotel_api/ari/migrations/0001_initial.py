@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('rooms', '0002_roomimage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AriChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room_type', models.CharField(blank=True, default='', max_length=20)),
+                ('start', models.DateField(blank=True, null=True)),
+                ('end', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ari_changes', to='rooms.room')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
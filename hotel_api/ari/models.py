@@ -0,0 +1,22 @@
+from django.db import models
+from rooms.models import Room
+
+
+class AriChange(models.Model):
+    """
+    Append-only log of room-night ranges whose availability or rate changed.
+    The highest id is the ARI version token handed to channel managers.
+    A null room means every room of `room_type`; null dates are unbounded.
+    """
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, null=True, blank=True, related_name="ari_changes")
+    room_type = models.CharField(max_length=20, blank=True, default='')
+    start = models.DateField(null=True, blank=True)
+    end = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        target = self.room_id or self.room_type
+        return f"#{self.id} {target} {self.start or '...'} - {self.end or '...'}"
@@ -0,0 +1,52 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from bookings.models import Booking
+from bookings.signals import bookings_bulk_created
+from pricing.engine import next_month
+from pricing.models import RatePlan, RateCalendar
+from rooms.models import Room
+from .models import AriChange
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, created, **kwargs):
+    # post_save runs before Booking.save refreshes _loaded_occupancy, so it
+    # still holds the room and dates the booking occupied before this save
+    previous = getattr(instance, '_loaded_occupancy', None)
+    if previous == instance.occupancy_key:
+        return
+    changes = [AriChange(room_id=instance.room_id, start=instance.check_in, end=instance.check_out)]
+    if previous:
+        room_id, check_in, check_out, _ = previous
+        changes.append(AriChange(room_id=room_id, start=check_in, end=check_out))
+    AriChange.objects.bulk_create(changes)
+
+
+@receiver(bookings_bulk_created, sender=Booking)
+def bookings_imported(sender, bookings, **kwargs):
+    AriChange.objects.bulk_create([
+        AriChange(room_id=booking.room_id, start=booking.check_in, end=booking.check_out) for booking in bookings
+    ])
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    AriChange.objects.create(room_id=instance.room_id, start=instance.check_in, end=instance.check_out)
+
+
+@receiver(post_save, sender=Room)
+def room_saved(sender, instance, **kwargs):
+    # New room or base price change: every date may be affected
+    AriChange.objects.create(room=instance)
+
+
+@receiver([post_save, post_delete], sender=RatePlan)
+def rate_plan_changed(sender, instance, **kwargs):
+    AriChange.objects.create(room_type=instance.room_type)
+
+
+@receiver([post_save, post_delete], sender=RateCalendar)
+def rate_calendar_changed(sender, instance, **kwargs):
+    AriChange.objects.create(
+        room_type=instance.rate_plan.room_type, start=instance.month, end=next_month(instance.month)
+    )
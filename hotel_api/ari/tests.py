@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from bookings.models import Booking
+from pricing.models import RatePlan, RateCalendar
+from rooms.models import Room
+from .export import current_version
+
+START = date(2030, 3, 1)
+
+
+@override_settings(CHANGE_FEED_SETTLE=0)
+class AriDeltaTests(TestCase):
+    """GET /api/ari/?since=: only the cells changed after a version"""
+
+    def setUp(self):
+        self.standard = Room.objects.create(name="Quarto", room_type="standard", description="Teste", price_per_night=100)
+        self.deluxe = Room.objects.create(name="Suíte", room_type="deluxe", description="Teste", price_per_night=200)
+        self.plan = RatePlan.objects.create(name="Tarifa", room_type="standard")
+        self.client = APIClient()
+
+    def book(self, room, check_in, nights):
+        return Booking.objects.create(room=room, name='Hóspede', email='a@example.com', check_in=check_in,
+                                      check_out=check_in + timedelta(days=nights), status='confirmed')
+
+    def export(self, since, days=90):
+        return self.client.get('/api/ari/', {'start_date': str(START), 'days': days, 'since': since})
+
+    def segments(self, since):
+        response = self.export(since)
+        self.assertEqual(response.status_code, 200)
+        return {
+            row['room_id']: [(segment['start'], segment['available']) for segment in row['segments']]
+            for row in response.json()['rooms']
+        }
+
+    def test_since_returns_only_changed_segments(self):
+        version = current_version()
+        self.book(self.standard, START + timedelta(days=5), 3)
+
+        response = self.export(version)
+
+        self.assertEqual(response.json()['version'], current_version())
+        self.assertEqual(self.segments(version), {self.standard.id: [(str(START + timedelta(days=5)), [0, 0, 0])]})
+
+    def test_not_modified_when_caught_up(self):
+        self.book(self.standard, START, 2)
+        version = current_version()
+
+        self.assertEqual(self.export(version).status_code, 304)
+        self.assertEqual(self.export(version + 10).status_code, 304)
+        self.assertEqual(self.export(version - 1).status_code, 200)
+
+    def test_move_sends_old_and_new_ranges(self):
+        booking = self.book(self.standard, START + timedelta(days=2), 2)
+        version = current_version()
+
+        booking.room = self.deluxe
+        booking.check_in = START + timedelta(days=10)
+        booking.check_out = START + timedelta(days=12)
+        booking.save()
+
+        self.assertEqual(self.segments(version), {
+            self.standard.id: [(str(START + timedelta(days=2)), [1, 1])],
+            self.deluxe.id: [(str(START + timedelta(days=10)), [0, 0])],
+        })
+
+    def test_date_change_sends_both_ranges_merged_where_they_touch(self):
+        booking = self.book(self.standard, START + timedelta(days=2), 2)
+        version = current_version()
+
+        booking.check_in = START + timedelta(days=4)
+        booking.check_out = START + timedelta(days=6)
+        booking.save()
+
+        self.assertEqual(self.segments(version), {self.standard.id: [(str(START + timedelta(days=2)), [1, 1, 0, 0])]})
+
+    def test_cancellation_frees_its_range(self):
+        booking = self.book(self.standard, START + timedelta(days=2), 2)
+        version = current_version()
+
+        booking.status = 'cancelled'
+        booking.save()
+
+        self.assertEqual(self.segments(version), {self.standard.id: [(str(START + timedelta(days=2)), [1, 1])]})
+
+    def test_rate_calendar_edit_touches_only_its_month(self):
+        version = current_version()
+        RateCalendar.objects.create(rate_plan=self.plan, month=date(2030, 4, 1), rates=['150.00'] * 30)
+
+        response = self.export(version)
+
+        rows = response.json()['rooms']
+        self.assertEqual([row['room_id'] for row in rows], [self.standard.id])
+        [segment] = rows[0]['segments']
+        self.assertEqual(segment['start'], '2030-04-01')
+        self.assertEqual(segment['rates'], ['150.00'] * 30)
@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('ari/', views.ari_export, name='ari-export'),
+]
@@ -0,0 +1,47 @@
+from rest_framework import status, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from django.http import StreamingHttpResponse
+from datetime import datetime, date, timedelta
+from hotel_api.streaming import ndjson_lines
+from rooms.models import Room
+from .export import ari_rows, current_version
+
+MAX_DAYS = 730
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def ari_export(request):
+    """
+    Availability and rates matrix for every room
+    Query params: start_date (default today), days (default 365), rooms (optional, comma separated ids),
+    since (optional version token: only cells changed after it), stream ("ndjson" for one line per room)
+    """
+    params = request.query_params
+    try:
+        start = datetime.strptime(params['start_date'], '%Y-%m-%d').date() if params.get('start_date') else date.today()
+        days = int(params.get('days', 365))
+        since = int(params['since']) if params.get('since') else None
+        rooms = Room.objects.order_by('id')
+        if params.get('rooms'):
+            rooms = rooms.filter(id__in=[int(i) for i in params['rooms'].split(',')])
+    except ValueError:
+        return Response({'error': 'Invalid start_date, days, since or rooms parameter'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not 1 <= days <= MAX_DAYS:
+        return Response({'error': f'days must be between 1 and {MAX_DAYS}'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Read the version before the data: a change racing with this export is sent again next time
+    version = current_version()
+    if since is not None and since >= version:
+        return Response(status=status.HTTP_304_NOT_MODIFIED)
+    
+    end = start + timedelta(days=days)
+    header = {'version': version, 'since': since, 'start_date': str(start), 'days': days}
+    rows = ari_rows(rooms, start, end, since)
+    
+    if params.get('stream') == 'ndjson':
+        return StreamingHttpResponse(ndjson_lines([header], rows), content_type='application/x-ndjson')
+    
+    return Response({**header, 'rooms': list(rows)})
@@ -0,0 +1,65 @@
+"""
+Async read paths for the busiest booking endpoints
+
+Plain async Django views returning the same JSON as the BookingViewSet
+actions they mirror. Under hotel_api.asgi a slow query no longer pins a
+worker thread for the whole request.
+"""
+from datetime import date
+from django.http import JsonResponse
+from accounts.permissions import Capability, atoken_capabilities
+from rooms.models import Room
+from .availability import parse_availability_window, room_availability_data
+from .models import Booking
+from .serializers import afast_booking_data
+
+
+async def room_availability(request):
+    """
+    Async BookingViewSet.room_availability
+    Query params: room_id, start_date (optional), end_date (optional), compact (optional)
+    """
+    room_id = request.GET.get('room_id')
+    
+    if not room_id:
+        return JsonResponse({'error': 'room_id parameter is required'}, status=400)
+    
+    try:
+        room = await Room.objects.aget(id=room_id)
+    except (Room.DoesNotExist, ValueError):
+        return JsonResponse({'error': 'Room not found'}, status=404)
+    
+    try:
+        start_date, end_date = parse_availability_window(request.GET.get('start_date'), request.GET.get('end_date'))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date format. Use YYYY-MM-DD'}, status=400)
+    
+    bookings = Booking.objects.filter(
+        room=room,
+        check_out__gt=start_date,
+        check_in__lt=end_date,
+        status__in=['confirmed', 'pending']
+    ).values('check_in', 'check_out', 'booking_number')
+    
+    compact = request.GET.get('compact') in ('1', 'true')
+    bookings = [booking async for booking in bookings]
+    return JsonResponse(room_availability_data(room, start_date, end_date, bookings, compact))
+
+
+async def my_bookings(request):
+    """Async BookingViewSet.my_bookings"""
+    email = request.GET.get('email')
+    if not email:
+        return JsonResponse({'error': 'Email parameter is required'}, status=400)
+    
+    return JsonResponse(await afast_booking_data(Booking.objects.filter(email=email)), safe=False)
+
+
+async def upcoming(request):
+    """Async BookingViewSet.upcoming (staff, token authentication only)"""
+    if not await atoken_capabilities(request) & Capability.VIEW_BOOKINGS:
+        return JsonResponse({'detail': 'You do not have permission to perform this action.'}, status=403)
+    
+    today = date.today()
+    bookings = Booking.objects.filter(check_in__gte=today, status='confirmed')
+    return JsonResponse(await afast_booking_data(bookings, today), safe=False)
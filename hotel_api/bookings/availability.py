@@ -0,0 +1,143 @@
+"""
+Interval-based availability engine
+
+Bookings occupy half-open night intervals ``[check_in, check_out)``: the
+guest sleeps every night from check-in up to, but not including, the
+check-out date. Instead of expanding each booking night by night, the
+functions below sort and merge those intervals once and answer range and
+count questions directly from the merged list.
+"""
+import heapq
+from datetime import date, datetime, timedelta
+
+
+def merge_intervals(intervals):
+    """
+    Merge overlapping or touching [start, end) intervals.
+    Returns a sorted list of (start, end) tuples.
+    """
+    merged = []
+    for start, end in sorted(i for i in intervals if i[0] < i[1]):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def clip_intervals(merged, start_date, end_date):
+    """
+    Restrict merged intervals to the window [start_date, end_date)
+    """
+    clipped = []
+    for start, end in merged:
+        start, end = max(start, start_date), min(end, end_date)
+        if start < end:
+            clipped.append((start, end))
+    return clipped
+
+
+def free_intervals(merged, start_date, end_date):
+    """
+    Return the gaps between merged intervals inside [start_date, end_date)
+    """
+    free = []
+    cursor = start_date
+    for start, end in clip_intervals(merged, start_date, end_date):
+        if start > cursor:
+            free.append((cursor, start))
+        cursor = max(cursor, end)
+    if cursor < end_date:
+        free.append((cursor, end_date))
+    return free
+
+
+def count_nights(merged):
+    """
+    Count the nights covered by merged intervals
+    """
+    return sum((end - start).days for start, end in merged)
+
+
+def expand_nights(merged):
+    """
+    Yield every night covered by merged intervals as a date
+    """
+    for start, end in merged:
+        current = start
+        while current < end:
+            yield current
+            current += timedelta(days=1)
+
+
+def serialize_ranges(intervals):
+    """
+    Compact representation: one {'start', 'end'} dict per interval,
+    with ``end`` exclusive like a booking check-out date.
+    """
+    return [{'start': str(start), 'end': str(end)} for start, end in intervals]
+
+
+def overlapping_pairs(intervals):
+    """
+    Sweep (start, end, key) intervals once, in start order, and yield
+    (earlier key, later key) for every pair whose [start, end) overlap
+    """
+    active = []  # heap of (end, order, key) for intervals still open
+    for order, (start, end, key) in enumerate(sorted(intervals, key=lambda i: (i[0], i[1]))):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, _, other in active:
+            yield other, key
+        heapq.heappush(active, (end, order, key))
+
+
+def parse_availability_window(start_date_str, end_date_str, default_days=90):
+    """
+    Parse optional YYYY-MM-DD bounds (default: today for the next 90 days).
+    Raises ValueError on malformed dates.
+    """
+    if start_date_str:
+        start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
+    else:
+        start_date = date.today()
+
+    if end_date_str:
+        end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
+    else:
+        end_date = start_date + timedelta(days=default_days)
+    return start_date, end_date
+
+
+def room_availability_data(room, start_date, end_date, bookings, compact=False):
+    """
+    Response body of the room_availability endpoints. `bookings` are
+    {'check_in', 'check_out', 'booking_number'} dicts overlapping the window.
+    """
+    # Merge booking intervals once instead of expanding them night by night
+    occupied = merge_intervals(
+        (booking['check_in'], booking['check_out']) for booking in bookings
+    )
+
+    data = {
+        'room_id': room.id,
+        'room_name': room.name,
+        'start_date': str(start_date),
+        'end_date': str(end_date),
+    }
+
+    if compact:
+        # Compact format: [start, end) ranges instead of one string per night,
+        # counted inside the window like the ranges themselves
+        clipped = clip_intervals(occupied, start_date, end_date)
+        data['occupied_ranges'] = serialize_ranges(clipped)
+        data['free_ranges'] = serialize_ranges(free_intervals(occupied, start_date, end_date))
+        total = count_nights(clipped)
+    else:
+        data['unavailable_dates'] = [str(night) for night in expand_nights(occupied)]
+        total = len(data['unavailable_dates'])
+
+    data['bookings'] = list(bookings)
+    data['total_unavailable_days'] = total
+    return data
@@ -0,0 +1,148 @@
+"""
+Bulk booking import for group and corporate reservations
+
+A whole batch is validated before anything is written: field checks run
+per row, then every requested stay is checked against existing bookings
+and against the rest of the batch in a single sweep per room. Either every
+row is created (one bulk insert in one transaction) or nothing is, and the
+report lists all problems at once.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from rest_framework import serializers
+from pricing.engine import quote_rooms
+from rooms.models import Room
+from .availability import overlapping_pairs
+from .changes import record_changes
+from .models import Booking
+from .numbers import allocate_booking_numbers
+from .occupancy import sync_room_nights
+from .serializers import BookingSerializer
+from .signals import bookings_bulk_created
+from .utils import queue_booking_confirmation_emails
+
+MAX_IMPORT_ROWS = 1000
+
+
+class ImportRoomField(serializers.PrimaryKeyRelatedField):
+    """Resolve rooms from the batch's preloaded {id: Room} map instead of one query per row"""
+    def to_internal_value(self, data):
+        try:
+            return self.context['rooms'][int(data)]
+        except (KeyError, TypeError, ValueError):
+            self.fail('does_not_exist', pk_value=data)
+
+
+class BookingImportSerializer(BookingSerializer):
+    room = ImportRoomField(queryset=Room.objects.all())
+
+    def check_room_nights(self, room, check_in, check_out):
+        # Availability is checked for the whole batch by find_conflicts
+        pass
+
+
+def find_conflicts(rows):
+    """
+    rows: [(row index, validated data)]. Returns one report per row whose
+    stay overlaps an existing booking or another row of the batch.
+    """
+    if not rows:
+        return []
+
+    stays = defaultdict(list)
+    for index, data in rows:
+        stays[data['room'].pk].append((data['check_in'], data['check_out'], ('row', index)))
+
+    window_start = min(data['check_in'] for _, data in rows)
+    window_end = max(data['check_out'] for _, data in rows)
+    existing = Booking.objects.overlapping(window_start, window_end).filter(room_id__in=stays).values_list(
+        'room_id', 'check_in', 'check_out', 'booking_number'
+    )
+    for room_id, check_in, check_out, booking_number in existing:
+        stays[room_id].append((check_in, check_out, ('booking', booking_number)))
+
+    clashes = defaultdict(list)
+    for intervals in stays.values():
+        for first, second in overlapping_pairs(intervals):
+            for key, other in ((first, second), (second, first)):
+                if key[0] == 'row':
+                    clashes[key[1]].append(
+                        {'booking_number': other[1]} if other[0] == 'booking' else {'row': other[1]}
+                    )
+
+    data_by_row = dict(rows)
+    return [
+        {
+            'row': index,
+            'room': data_by_row[index]['room'].pk,
+            'check_in': str(data_by_row[index]['check_in']),
+            'check_out': str(data_by_row[index]['check_out']),
+            'conflicts_with': clashes[index],
+        }
+        for index in sorted(clashes)
+    ]
+
+
+def stay_totals(rows):
+    """
+    {row index: total price}, quoting every room of a shared stay together
+    (a group block costs one pricing call)
+    """
+    stays = defaultdict(list)
+    for index, data in rows:
+        stays[(data['check_in'], data['check_out'])].append((index, data['room']))
+
+    totals = {}
+    for (check_in, check_out), members in stays.items():
+        quotes = quote_rooms({room.pk: room for _, room in members}.values(), check_in, check_out)
+        for index, room in members:
+            totals[index] = Decimal(quotes[room.pk]['total'])
+    return totals
+
+
+def import_bookings(rows, defaults=None, dry_run=False, send_confirmation=True):
+    """
+    Validate and create a batch of bookings.
+    `defaults` are merged under every row (e.g. the dates and contact of a
+    group block). Returns (bookings, errors, conflicts); bookings is empty
+    whenever errors or conflicts are reported, or for a dry run.
+    """
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise serializers.ValidationError({'bookings': f'At most {MAX_IMPORT_ROWS} bookings per import.'})
+
+    context = {'rooms': Room.objects.in_bulk()}
+    valid, errors = [], []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append({'row': index, 'errors': {'non_field_errors': ['Cada reserva deve ser um objeto.']}})
+            continue
+        serializer = BookingImportSerializer(data={**(defaults or {}), **row}, context=context)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors.append({'row': index, 'errors': serializer.errors})
+
+    with transaction.atomic():
+        # Same per-room lock as single bookings (a no-op on SQLite, which serializes writers)
+        room_ids = sorted({data['room'].pk for _, data in valid})
+        list(Room.objects.select_for_update().filter(pk__in=room_ids).values_list('pk', flat=True))
+
+        conflicts = find_conflicts(valid)
+        if errors or conflicts or dry_run:
+            return [], errors, conflicts
+
+        totals = stay_totals(valid)
+        bookings = [
+            Booking(**{**data, 'booking_number': number, 'total_price': totals[index], 'status': 'confirmed'})
+            for (index, data), number in zip(valid, allocate_booking_numbers(len(valid)))
+        ]
+        Booking.objects.bulk_create(bookings)
+        sync_room_nights(bookings)
+        record_changes(bookings, adding=True)
+        bookings_bulk_created.send(sender=Booking, bookings=bookings)
+
+        if send_confirmation:
+            transaction.on_commit(lambda: queue_booking_confirmation_emails(bookings))
+
+    return bookings, [], []
@@ -0,0 +1,113 @@
+"""
+Booking change feed
+
+Every booking write appends a BookingChange row in the same transaction;
+consumers read rows after the last sequence number they have seen.
+
+That only works if ids become visible in order. SQLite serializes writers
+(BEGIN IMMEDIATE), so they do. PostgreSQL hands out ids at insert time and a
+transaction that commits late leaves a row below ids readers have already
+passed, so readers only see rows older than CHANGE_FEED_SETTLE seconds
+(settled), by which time the transactions that took the ids before them
+have finished.
+"""
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .live import get_broker
+from .models import Booking, BookingChange
+
+
+def snapshot(booking):
+    return {field.attname: getattr(booking, field.attname) for field in Booking._meta.concrete_fields}
+
+
+def change_event(booking, previous, adding):
+    if adding:
+        return 'created'
+    if booking.status == 'cancelled' and (previous is None or previous[3]):
+        return 'cancelled'
+    return 'updated'
+
+
+def previous_stay(booking, previous):
+    if previous is None or previous == booking.occupancy_key:
+        return None
+    room_id, check_in, check_out, occupying = previous
+    return {'room': room_id, 'check_in': check_in, 'check_out': check_out, 'occupying': occupying}
+
+
+def record_changes(bookings, previous=None, adding=False, event=None):
+    """
+    Append one change per booking. `previous` is the occupancy key
+    (room, check-in, check-out, holds nights) of a single booking
+    before the write, as loaded from the database.
+    """
+    changes = BookingChange.objects.bulk_create([
+        BookingChange(
+            booking_id=booking.pk,
+            booking_number=booking.booking_number,
+            event=event or change_event(booking, previous, adding),
+            data=snapshot(booking),
+            previous=previous_stay(booking, previous),
+        )
+        for booking in bookings
+    ])
+    transaction.on_commit(lambda: get_broker().publish_changes(changes))
+
+
+def update_bookings(queryset, **fields):
+    """
+    QuerySet.update() that also records 'updated' events, since
+    bulk updates bypass Booking.save
+    """
+    with transaction.atomic():
+        updated = queryset.update(**fields)
+        if updated:
+            record_changes(list(queryset), event='updated')
+    return updated
+
+
+def settled(queryset):
+    """
+    Hold back change-log rows (BookingChange, AriChange) younger than
+    CHANGE_FEED_SETTLE seconds; a no-op when it is 0 (SQLite)
+    """
+    settle = getattr(settings, 'CHANGE_FEED_SETTLE', 0)
+    if not settle:
+        return queryset
+    return queryset.filter(created_at__lte=timezone.now() - timedelta(seconds=settle))
+
+
+def latest_seq():
+    """
+    Highest settled sequence number: every change at or below it is committed
+    """
+    return settled(BookingChange.objects.order_by('-id')).values_list('id', flat=True).first() or 0
+
+
+def changes_since(since, limit):
+    """
+    Settled changes after sequence number `since`, oldest first
+    """
+    return list(
+        settled(BookingChange.objects.filter(id__gt=since)).order_by('id')
+        .values('id', 'booking_id', 'booking_number', 'event', 'data', 'previous', 'created_at')[:limit]
+    )
+
+
+def wait_for_changes(since, timeout, interval=0.5):
+    """
+    Long-poll: block until a change after `since` exists or `timeout`
+    seconds pass. Each check is a single indexed EXISTS query.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        if settled(BookingChange.objects.filter(id__gt=since)).exists():
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(interval, remaining))
@@ -0,0 +1,46 @@
+"""
+Query-parameter filters shared by the booking list and export endpoints
+"""
+from datetime import datetime
+from rest_framework.exceptions import ValidationError
+from .numbers import is_valid_booking_number
+
+
+def parse_date_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValidationError({name: 'Dates must use the YYYY-MM-DD format'})
+
+
+def filter_bookings(queryset, params):
+    """
+    Apply status (comma separated), room, booking_number and
+    start_date/end_date (inclusive check-in range) filters from query parameters
+    """
+    start_date = parse_date_param(params, 'start_date')
+    end_date = parse_date_param(params, 'end_date')
+    if start_date:
+        queryset = queryset.filter(check_in__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(check_in__lte=end_date)
+
+    if params.get('status'):
+        queryset = queryset.filter(status__in=params['status'].split(','))
+
+    if params.get('room'):
+        try:
+            queryset = queryset.filter(room_id=int(params['room']))
+        except ValueError:
+            raise ValidationError({'room': 'room must be a room id'})
+
+    if params.get('booking_number'):
+        # Malformed or mistyped numbers (bad check character) never match a booking
+        if not is_valid_booking_number(params['booking_number']):
+            raise ValidationError({'booking_number': 'Invalid booking number'})
+        queryset = queryset.filter(booking_number=params['booking_number'].strip().upper())
+
+    return queryset
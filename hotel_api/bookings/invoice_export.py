@@ -0,0 +1,113 @@
+"""
+Bulk invoice export
+
+Invoices are rendered in a process pool from plain invoice contexts and
+written to the response as they finish, so the whole archive is never
+held in memory.
+
+The pool is started from inside the response generator, i.e. in the web
+worker process. It is only created when something has to be rendered and
+INVOICE_EXPORT_WORKERS is above 1; set it to 1 to render in the worker
+itself where forking the server process is not acceptable (threaded or
+ASGI servers, hosts that limit processes).
+"""
+import os
+import zipfile
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from tempfile import SpooledTemporaryFile
+from django.conf import settings
+from django.core.cache import caches
+from .utils import invoice_context, invoice_etag, render_invoice_pdf, build_invoice_document
+
+
+def export_workers():
+    return getattr(settings, 'INVOICE_EXPORT_WORKERS', min(4, os.cpu_count() or 1))
+
+
+class StreamBuffer:
+    """
+    Write-only file object whose contents are drained after each ZIP entry
+    """
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def render_window(contexts, workers):
+    """
+    Yield render_invoice_pdf(context) in order, keeping at most
+    INVOICE_EXPORT_WINDOW renders in flight so finished PDFs never pile up
+    faster than the response consumes them
+    """
+    if workers <= 1 or len(contexts) <= 1:
+        for context in contexts:
+            yield render_invoice_pdf(context)
+        return
+
+    window = getattr(settings, 'INVOICE_EXPORT_WINDOW', 2 * workers)
+    pending = iter(contexts)
+    in_flight = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for context in islice(pending, window):
+            in_flight.append(pool.submit(render_invoice_pdf, context))
+        while in_flight:
+            pdf = in_flight.popleft().result()
+            for context in islice(pending, 1):
+                in_flight.append(pool.submit(render_invoice_pdf, context))
+            yield pdf
+
+
+def render_invoices(contexts):
+    """
+    Yield (context, pdf) in order. Cached PDFs are reused; the rest are
+    rendered by a process pool. Bulk renders are not written back to the
+    cache so an export does not evict invoices staff are working on.
+    """
+    cache = caches['invoices']
+    cached = cache.get_many([invoice_etag(context) for context in contexts])
+    missing = [context for context in contexts if invoice_etag(context) not in cached]
+
+    rendered = render_window(missing, export_workers())
+    for context in contexts:
+        pdf = cached.get(invoice_etag(context))
+        if pdf is None:
+            pdf = next(rendered)
+        yield context, pdf
+
+
+def stream_invoice_zip(bookings):
+    """
+    Generator of ZIP archive bytes with one PDF per booking
+    """
+    contexts = [invoice_context(booking) for booking in bookings]
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for context, pdf in render_invoices(contexts):
+            archive.writestr(f"invoice_{context['booking_number']}.pdf", pdf)
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def merged_invoice_pdf(bookings):
+    """
+    Render all bookings into one PDF, one invoice per page group.
+    The document is built in a single pass into a spooled temporary file
+    (kept in memory up to 10 MB, then on disk) and returned rewound.
+    """
+    output = SpooledTemporaryFile(max_size=10 * 1024 * 1024)
+    build_invoice_document(output, [invoice_context(booking) for booking in bookings])
+    output.seek(0)
+    return output
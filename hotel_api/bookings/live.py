@@ -0,0 +1,183 @@
+"""
+Live availability pub/sub
+
+Committed booking changes that take or free room-nights are turned into
+availability events and fanned out to Server-Sent Events subscribers.
+Each subscriber is an asyncio queue on the server's event loop; writers
+run in sync threads and hand events over with ``call_soon_threadsafe``,
+so an idle connection costs a queue and a suspended coroutine, not a thread.
+
+Backends (``AVAILABILITY_BROKER`` setting):
+
+- ``local``: events are published in-process right after commit. Writers
+  and subscribers must share the process (e.g. a single ASGI worker).
+- ``changefeed``: one thread per process tails the BookingChange table,
+  so writes from any process (WSGI workers, management commands) reach
+  the subscribers of every ASGI worker. It only reads settled changes, so
+  events lag by CHANGE_FEED_SETTLE seconds where that is set.
+"""
+import asyncio
+import threading
+import time
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError, close_old_connections
+
+
+def availability_events(change):
+    """
+    Room-night ranges a BookingChange took or released, in order.
+    Ranges are [start, end) like a booking stay; `available` is True
+    when the nights were released.
+    """
+    data, previous = change.data, change.previous
+    occupying = data['status'] != 'cancelled'
+    ranges = []
+    if change.event == 'created':
+        if occupying:
+            ranges.append((data['room_id'], data['check_in'], data['check_out'], False))
+    elif change.event == 'deleted':
+        if occupying:
+            ranges.append((data['room_id'], data['check_in'], data['check_out'], True))
+    elif previous is not None:
+        if previous['occupying']:
+            ranges.append((previous['room'], previous['check_in'], previous['check_out'], True))
+        if occupying:
+            ranges.append((data['room_id'], data['check_in'], data['check_out'], False))
+
+    return [
+        {
+            'seq': change.id,
+            'booking_number': change.booking_number,
+            'room': room_id,
+            'start': str(start),
+            'end': str(end),
+            'available': available,
+        }
+        for room_id, start, end, available in ranges
+    ]
+
+
+class Subscription:
+    """
+    One stream's queue. Must be created inside the consumer's event loop.
+    """
+    def __init__(self, rooms=None, maxsize=100):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.rooms = rooms
+        # Set when events were dropped because the client reads too slowly
+        self.overflowed = False
+
+    def deliver(self, events):
+        # Runs on self.loop
+        for event in events:
+            if self.rooms and event['room'] not in self.rooms:
+                continue
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.overflowed = True
+                return
+
+    def drain(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.overflowed = False
+
+
+class LocalBroker:
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, rooms=None):
+        subscription = Subscription(rooms, getattr(settings, 'AVAILABILITY_STREAM_QUEUE_SIZE', 100))
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish_changes(self, changes):
+        """
+        Called after commit with the BookingChange rows just written
+        """
+        self.publish([event for change in changes for event in availability_events(change)])
+
+    def publish(self, events):
+        if not events:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, events)
+            except RuntimeError:
+                # Event loop already closed
+                self.unsubscribe(subscription)
+
+
+class ChangeFeedBroker(LocalBroker):
+    def __init__(self, interval=1.0):
+        super().__init__()
+        self.interval = interval
+        self._thread = None
+
+    def publish_changes(self, changes):
+        # The tailing thread reads every change from the table, including this one
+        pass
+
+    def subscribe(self, rooms=None):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._tail, name='availability-changefeed', daemon=True)
+                self._thread.start()
+        return super().subscribe(rooms)
+
+    def _tail(self):
+        from .changes import latest_seq, settled
+        from .models import BookingChange
+
+        since = None
+        while True:
+            changes = []
+            try:
+                if not self._subscribers:
+                    # Nobody listening: resume from the head once someone subscribes
+                    since = None
+                elif since is None:
+                    since = latest_seq()
+                else:
+                    changes = list(settled(BookingChange.objects.filter(id__gt=since)).order_by('id')[:500])
+            except DatabaseError:
+                pass
+            finally:
+                close_old_connections()
+
+            if changes:
+                since = changes[-1].id
+                LocalBroker.publish_changes(self, changes)
+            else:
+                time.sleep(self.interval)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                backend = getattr(settings, 'AVAILABILITY_BROKER', 'local')
+                if backend == 'local':
+                    _broker = LocalBroker()
+                elif backend == 'changefeed':
+                    _broker = ChangeFeedBroker(getattr(settings, 'AVAILABILITY_BROKER_POLL_INTERVAL', 1.0))
+                else:
+                    raise ImproperlyConfigured(f"Unknown AVAILABILITY_BROKER {backend!r}")
+    return _broker
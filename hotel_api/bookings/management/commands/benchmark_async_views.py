@@ -0,0 +1,158 @@
+import asyncio
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.authtoken.models import Token
+from accounts.models import User
+from bookings.models import Booking
+from rooms.models import Room, RoomImage
+
+# (label, sync path, async path, query string)
+ENDPOINTS = [
+    ('room list', '/api/rooms/', '/api/async/rooms/', ''),
+    ('room_availability', '/api/bookings/room_availability/', '/api/async/bookings/room_availability/', 'room_id={room}&compact=true'),
+    ('my_bookings', '/api/bookings/my_bookings/', '/api/async/bookings/my_bookings/', 'email=guest0@example.com'),
+    ('upcoming', '/api/bookings/upcoming/', '/api/async/bookings/upcoming/', ''),
+]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the sync (WSGI, thread pool) and async (ASGI, event loop) read paths in-process "
+        "and report requests per second and p50/p99 latency. Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help="Requests per endpoint and path")
+        parser.add_argument('--concurrency', type=int, default=32, help="In-flight requests (threads for WSGI)")
+        parser.add_argument('--bookings', type=int, default=5000, help="Bookings to generate")
+
+    def seed(self, count):
+        rooms = [
+            Room.objects.create(name=f"Quarto {i}", room_type="standard", description="Benchmark", price_per_night=100)
+            for i in range(10)
+        ]
+        RoomImage.objects.bulk_create([
+            RoomImage(room=room, image_url=f"https://example.com/{room.id}-{n}.jpg", order=n)
+            for room in rooms for n in range(3)
+        ])
+        # Mostly past stays; the last 30 days' worth are upcoming
+        start = date.today() - timedelta(days=count // len(rooms) - 30)
+        # bulk_create skips Booking.save: no occupancy rows or change events, numbers are set here
+        Booking.objects.bulk_create([
+            Booking(
+                booking_number=f"BENCH-{i:08d}", room=rooms[i % len(rooms)], name="Hóspede",
+                email=f"guest{i % 200}@example.com", check_in=start + timedelta(days=i // len(rooms)),
+                check_out=start + timedelta(days=i // len(rooms) + 1), total_price=100, status='confirmed',
+            )
+            for i in range(count)
+        ], batch_size=1000)
+        # upcoming is a staff endpoint
+        staff = User.objects.create_user('benchmark', 'benchmark@example.com', role=User.Role.STAFF)
+        return rooms[0].id, Token.objects.create(user=staff).key
+
+    def run_wsgi(self, path, query, token, total, concurrency):
+        handler = WSGIHandler()
+
+        def get(_):
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query,
+                'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+                'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http', 'HTTP_AUTHORIZATION': f'Token {token}',
+            }
+            started = time.perf_counter()
+            status = []
+            result = handler(environ, lambda s, headers, exc_info=None: status.append(s))
+            body = b''.join(result)
+            result.close()
+            return time.perf_counter() - started, status[0], body
+
+        with ThreadPoolExecutor(concurrency) as pool:
+            started = time.perf_counter()
+            results = list(pool.map(get, range(total)))
+            return time.perf_counter() - started, results
+
+    def run_asgi(self, path, query, token, total, concurrency):
+        handler = ASGIHandler()
+
+        async def get(semaphore):
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+                'headers': [(b'host', b'localhost'), (b'authorization', f'Token {token}'.encode())], 'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+            }
+            disconnect = asyncio.Event()
+            sent = {'body': b''}
+
+            async def receive():
+                if 'requested' not in sent:
+                    sent['requested'] = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    sent['status'] = message['status']
+                else:
+                    sent['body'] += message.get('body', b'')
+
+            async with semaphore:
+                started = time.perf_counter()
+                await handler(scope, receive, send)
+                elapsed = time.perf_counter() - started
+            disconnect.set()
+            return elapsed, sent['status'], sent['body']
+
+        async def run():
+            semaphore = asyncio.Semaphore(concurrency)
+            started = time.perf_counter()
+            results = await asyncio.gather(*(get(semaphore) for _ in range(total)))
+            return time.perf_counter() - started, results
+
+        return asyncio.run(run())
+
+    def report(self, label, elapsed, results):
+        latencies = [result[0] for result in results]
+        self.stdout.write(
+            f"  {label:<6} {len(results) / elapsed:>9.0f} req/s   "
+            f"p50 {percentile(latencies, 0.50) * 1000:>7.1f} ms   p99 {percentile(latencies, 0.99) * 1000:>7.1f} ms"
+        )
+
+    def handle(self, *args, **options):
+        total, concurrency = options['requests'], options['concurrency']
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            room_id, token = self.seed(options['bookings'])
+            connection.close()
+            self.stdout.write(f"{options['bookings']} bookings, {total} requests per path, concurrency {concurrency}")
+
+            for label, sync_path, async_path, query in ENDPOINTS:
+                query = query.format(room=room_id)
+                sync_elapsed, sync_results = self.run_wsgi(sync_path, query, token, total, concurrency)
+                async_elapsed, async_results = self.run_asgi(async_path, query, token, total, concurrency)
+
+                sync_status, sync_body = sync_results[0][1:]
+                async_status, async_body = async_results[0][1:]
+                if not sync_status.startswith('200') or async_status != 200:
+                    raise CommandError(f"{label}: unexpected status {sync_status} / {async_status}")
+                if json.loads(sync_body) != json.loads(async_body):
+                    raise CommandError(f"{label}: async response differs from the sync endpoint")
+
+                self.stdout.write(label)
+                self.report('sync', sync_elapsed, sync_results)
+                self.report('async', async_elapsed, async_results)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,105 @@
+import math
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, connection
+from bookings.models import Booking
+from bookings.numbers import allocate_booking_numbers
+from rooms.models import Room
+
+
+def legacy_booking_number():
+    # The previous generator: 4 random hex characters per day
+    return f"HJ-{datetime.now():%Y%m%d}-{uuid.uuid4().hex[:4].upper()}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure booking number allocation under concurrent inserts (legacy random suffix vs "
+        "the counter allocator). Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help="Concurrent writers")
+        parser.add_argument('--count', type=int, default=250, help="Bookings inserted per thread")
+
+    def run_threads(self, threads, work):
+        def run(thread):
+            try:
+                return work(thread)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            results = list(pool.map(run, range(threads)))
+        return time.perf_counter() - started, results
+
+    def insert_bookings(self, rooms, count, numbers):
+        """
+        Each thread books its own room on consecutive nights; returns a worker
+        reporting (inserted, collisions)
+        """
+        start = date.today() + timedelta(days=30)
+
+        def work(thread):
+            inserted = collisions = 0
+            for i in range(count):
+                booking = Booking(
+                    room=rooms[thread], name="Hóspede", email="benchmark@example.com",
+                    check_in=start + timedelta(days=i), check_out=start + timedelta(days=i + 1),
+                    booking_number=numbers(),
+                )
+                try:
+                    booking.save()
+                    inserted += 1
+                except IntegrityError:
+                    # The legacy path had no retry: a duplicate number fails the booking
+                    collisions += 1
+            return inserted, collisions
+        return work
+
+    def handle(self, *args, **options):
+        threads, count = options['threads'], options['count']
+        total = threads * count
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.stdout.write(f"{threads} threads x {count} bookings")
+
+            for label, numbers in (
+                ('legacy random suffix', legacy_booking_number),
+                ('counter allocator', lambda: allocate_booking_numbers()[0]),
+            ):
+                Booking.objects.all().delete()
+                rooms = [
+                    Room.objects.create(name=f"Quarto {i}", room_type="standard", description="Benchmark", price_per_night=100)
+                    for i in range(threads)
+                ]
+                connection.close()
+                elapsed, results = self.run_threads(threads, self.insert_bookings(rooms, count, numbers))
+                inserted = sum(r[0] for r in results)
+                collisions = sum(r[1] for r in results)
+                unique = Booking.objects.values('booking_number').distinct().count()
+                self.stdout.write(
+                    f"{label:<22} {inserted / elapsed:>8.0f} bookings/s   "
+                    f"failed on duplicate number: {collisions}   unique numbers: {unique}/{inserted}"
+                )
+
+            connection.close()
+            elapsed, _ = self.run_threads(threads, lambda thread: [allocate_booking_numbers() for _ in range(count)])
+            self.stdout.write(f"{'allocation only':<22} {total / elapsed:>8.0f} numbers/s ({threads} threads, one per call)")
+
+            started = time.perf_counter()
+            allocate_booking_numbers(total)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{'batch allocation':<22} {total / elapsed:>8.0f} numbers/s (one call of {total})")
+
+            self.stdout.write("Legacy collision odds per day (birthday bound, 65,536 suffixes):")
+            for per_day in (50, 100, 300, 1000):
+                odds = 1 - math.exp(-per_day * (per_day - 1) / (2 * 16 ** 4))
+                self.stdout.write(f"  {per_day:>5} bookings/day: {odds:6.1%}")
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,59 @@
+import time
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from bookings.models import Booking
+from bookings.serializers import BookingSerializer, fast_booking_data
+from rooms.models import Room
+
+
+class Command(BaseCommand):
+    help = "Compare BookingSerializer with the fast .values() read path on generated bookings (rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help="Number of bookings to generate")
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per path; the best time is reported")
+
+    def best_of(self, repeat, func):
+        best = None
+        result = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        with transaction.atomic():
+            room = Room.objects.create(
+                name="Benchmark", room_type="standard", description="Benchmark", price_per_night=100
+            )
+            start = date.today() - timedelta(days=rows)
+            # bulk_create skips Booking.save: no occupancy rows, numbers are set here
+            Booking.objects.bulk_create([
+                Booking(
+                    booking_number=f"BENCH-{i:08d}", room=room, name="Hóspede",
+                    email="benchmark@example.com", check_in=start + timedelta(days=i),
+                    check_out=start + timedelta(days=i + 2), total_price=200, status='confirmed',
+                )
+                for i in range(rows)
+            ], batch_size=1000)
+            bookings = Booking.objects.filter(email="benchmark@example.com")
+
+            drf_time, drf_data = self.best_of(
+                options['repeat'],
+                lambda: BookingSerializer(bookings.select_related('room'), many=True).data
+            )
+            fast_time, fast_data = self.best_of(options['repeat'], lambda: fast_booking_data(bookings))
+
+            transaction.set_rollback(True)
+
+        if [dict(item) for item in drf_data] != fast_data:
+            raise CommandError("Fast path output differs from BookingSerializer")
+
+        self.stdout.write(f"Rows:            {rows}")
+        self.stdout.write(f"BookingSerializer: {drf_time * 1000:.1f} ms")
+        self.stdout.write(f"Fast path:         {fast_time * 1000:.1f} ms")
+        self.stdout.write(self.style.SUCCESS(f"Speed-up:          {drf_time / fast_time:.1f}x (identical output)"))
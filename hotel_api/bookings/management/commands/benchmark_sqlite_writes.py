@@ -0,0 +1,123 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.test.utils import override_settings
+from bookings.changes import update_bookings
+from bookings.models import Booking
+from bookings.serializers import BookingSerializer
+from rooms.models import Room
+
+# (label, connection OPTIONS, SQLITE_PRAGMAS)
+PROFILES = [
+    ("django defaults", {'timeout': 5}, {}),
+    ("immediate only", {'transaction_mode': 'IMMEDIATE', 'timeout': 20}, {}),
+    ("tuned profile", None, None),  # this project's settings, with WAL
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test concurrent booking writes on SQLite with Django's default connection settings, "
+        "with BEGIN IMMEDIATE alone, and with the tuned profile (WAL, synchronous=NORMAL, "
+        "busy_timeout, mmap, BEGIN IMMEDIATE). "
+        "Runs against a throwaway test database per profile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=20, help="Concurrent writer threads")
+        parser.add_argument('--bookings', type=int, default=20, help="Bookings created per writer")
+        parser.add_argument('--readers', type=int, default=4, help="Threads reading availability meanwhile")
+
+    def write(self, room, count, errors):
+        """
+        One writer: create bookings through BookingSerializer (as POST /api/bookings/ does),
+        then flag each as invoiced (as the invoice action does)
+        """
+        start = date.today() + timedelta(days=30)
+        created = 0
+        for i in range(count):
+            try:
+                serializer = BookingSerializer(data={
+                    'room': room.pk, 'name': 'Hóspede', 'email': 'benchmark@example.com', 'guests': 1,
+                    'check_in': str(start + timedelta(days=2 * i)), 'check_out': str(start + timedelta(days=2 * i + 1)),
+                })
+                serializer.is_valid(raise_exception=True)
+                booking = serializer.save()
+                update_bookings(Booking.objects.filter(pk=booking.pk), invoice_generated=True)
+                created += 1
+            except OperationalError as e:
+                errors.append(str(e))
+        return created
+
+    def read(self, rooms, stop, errors):
+        reads = 0
+        while not stop.is_set():
+            try:
+                for room in rooms:
+                    list(Booking.objects.filter(room=room).values_list('check_in', 'check_out'))
+                    reads += 1
+            except OperationalError as e:
+                errors.append(str(e))
+        return reads
+
+    def run_profile(self, writers, count, readers):
+        rooms = [
+            Room.objects.create(name=f"Quarto {i}", room_type="standard", description="Benchmark", price_per_night=100)
+            for i in range(writers)
+        ]
+        connection.close()
+        errors = []
+        stop = threading.Event()
+
+        def run(work, *args):
+            try:
+                return work(*args)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(writers + readers) as pool:
+            reading = [pool.submit(run, self.read, rooms, stop, errors) for _ in range(readers)]
+            started = time.perf_counter()
+            created = sum(pool.map(lambda room: run(self.write, room, count, errors), rooms))
+            elapsed = time.perf_counter() - started
+            stop.set()
+            reads = sum(future.result() for future in reading)
+        return created, elapsed, reads, errors
+
+    def handle(self, *args, **options):
+        writers, count, readers = options['writers'], options['bookings'], options['readers']
+        if connection.vendor != 'sqlite':
+            raise CommandError("This benchmark is for SQLite databases")
+
+        # The throwaway databases get WAL even where the main one is left in its own mode
+        tuned_pragmas = {**settings.SQLITE_PRAGMAS, 'journal_mode': 'WAL', 'synchronous': 'NORMAL'}
+        settings_dict = connection.settings_dict
+        old_name, tuned_options = settings_dict['NAME'], settings_dict['OPTIONS']
+        self.stdout.write(f"{writers} writers x {count} bookings, {readers} concurrent readers")
+
+        for label, options_override, pragmas in PROFILES:
+            # Thread connections are built from this same settings dict
+            settings_dict['OPTIONS'] = tuned_options if options_override is None else options_override
+            try:
+                with override_settings(SQLITE_PRAGMAS=tuned_pragmas if pragmas is None else pragmas):
+                    connection.close()
+                    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+                    try:
+                        created, elapsed, reads, errors = self.run_profile(writers, count, readers)
+                        with connection.cursor() as cursor:
+                            journal_mode = cursor.execute('PRAGMA journal_mode').fetchone()[0]
+                    finally:
+                        connection.creation.destroy_test_db(old_name, verbosity=0)
+            finally:
+                settings_dict['OPTIONS'] = tuned_options
+
+            locked = sum('locked' in error for error in errors)
+            self.stdout.write(
+                f"{label:<16} ({journal_mode:>6}) {created / elapsed:>7.1f} bookings/s   "
+                f"{created}/{writers * count} written   {reads / elapsed:>7.0f} reads/s   "
+                f"'database is locked': {locked}   other errors: {len(errors) - locked}"
+            )
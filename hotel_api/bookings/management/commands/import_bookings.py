@@ -0,0 +1,64 @@
+import csv
+import json
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+from bookings.bulk import import_bookings
+
+
+def read_rows(path):
+    """
+    Rows and shared defaults from a CSV file (one booking per line, header
+    row with field names) or a JSON file (a list, or {"bookings", "defaults"})
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if path.lower().endswith('.json'):
+            data = json.load(f)
+            if isinstance(data, list):
+                return data, {}
+            return data.get('bookings', []), data.get('defaults', {})
+        # Empty cells fall back to the field default
+        return [{key: value for key, value in row.items() if value not in ('', None)} for row in csv.DictReader(f)], {}
+
+
+class Command(BaseCommand):
+    help = "Import a batch of bookings from a CSV or JSON file; nothing is created if any row fails"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSON file")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only")
+        parser.add_argument('--no-email', action='store_true', help="Do not queue confirmation emails")
+
+    def handle(self, *args, **options):
+        try:
+            rows, defaults = read_rows(options['path'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+        if not rows:
+            raise CommandError("No bookings found")
+
+        try:
+            bookings, errors, conflicts = import_bookings(
+                rows, defaults, dry_run=options['dry_run'], send_confirmation=not options['no_email']
+            )
+        except ValidationError as e:
+            raise CommandError(json.dumps(e.detail, ensure_ascii=False))
+
+        # Rows are reported 1-based, as in a spreadsheet without the header
+        for error in errors:
+            self.stderr.write(f"Row {error['row'] + 1}: {json.dumps(error['errors'], ensure_ascii=False)}")
+        for conflict in conflicts:
+            others = ', '.join(
+                other['booking_number'] if 'booking_number' in other else f"row {other['row'] + 1}"
+                for other in conflict['conflicts_with']
+            )
+            self.stderr.write(
+                f"Row {conflict['row'] + 1}: room {conflict['room']} "
+                f"{conflict['check_in']} - {conflict['check_out']} overlaps {others}"
+            )
+        if errors or conflicts:
+            raise CommandError(f"{len(errors) + len(conflicts)} rows rejected, no bookings created")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"{len(rows)} bookings are valid (dry run)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Created {len(bookings)} bookings"))
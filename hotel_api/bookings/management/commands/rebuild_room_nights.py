@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from bookings.occupancy import occupancy_drift, rebuild_room_nights
+
+
+class Command(BaseCommand):
+    help = "Rebuild the RoomNight occupancy table from bookings, or check it for drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only report drift between RoomNight and Booking; exit with an error if any is found",
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            missing, extra, conflicts = occupancy_drift()
+            for room_id, night, booking_id in conflicts:
+                self.stdout.write(f"Conflict: room {room_id} on {night} also claimed by booking {booking_id}")
+            self.stdout.write(f"Missing rows: {len(missing)}")
+            self.stdout.write(f"Extra rows: {len(extra)}")
+            if missing or extra:
+                raise CommandError("RoomNight table has drifted, run rebuild_room_nights to fix it")
+            self.stdout.write(self.style.SUCCESS("RoomNight table is in sync"))
+            return
+
+        with transaction.atomic():
+            written, conflicts = rebuild_room_nights()
+        for room_id, night, booking_id in conflicts:
+            self.stdout.write(self.style.WARNING(
+                f"Skipped room {room_id} on {night} for booking {booking_id}: night already held"
+            ))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} room nights"))
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:25
+
+import django.db.models.deletion
+from datetime import timedelta
+from django.db import migrations, models
+
+
+def populate_room_nights(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    RoomNight = apps.get_model('bookings', 'RoomNight')
+    rows = []
+    for booking in Booking.objects.exclude(status='cancelled').order_by('created_at', 'id'):
+        night = booking.check_in
+        while night < booking.check_out:
+            rows.append(RoomNight(room_id=booking.room_id, booking_id=booking.id, night=night))
+            night += timedelta(days=1)
+    # Legacy overlaps keep the oldest booking; rebuild_room_nights --check reports them
+    RoomNight.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+        ('rooms', '0002_roomimage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomNight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('night', models.DateField()),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_nights', to='bookings.booking')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nights', to='rooms.room')),
+            ],
+            options={
+                'ordering': ['room', 'night'],
+                'constraints': [models.UniqueConstraint(fields=('room', 'night'), name='unique_room_night')],
+            },
+        ),
+        migrations.RunPython(populate_room_nights, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_roomnight'),
+        ('rooms', '0002_roomimage'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['-created_at', 'id'], name='booking_created_cursor_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:34
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_booking_created_cursor_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('booking_id', models.BigIntegerField(db_index=True)),
+                ('booking_number', models.CharField(max_length=20)),
+                ('event', models.CharField(choices=[('created', 'Criada'), ('updated', 'Atualizada'), ('cancelled', 'Cancelada'), ('deleted', 'Removida')], max_length=20)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('previous', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
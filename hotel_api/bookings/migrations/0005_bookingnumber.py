@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_bookingchange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingNumber',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# Only created on PostgreSQL: a GiST exclusion constraint that rejects two
+# occupying (non-cancelled) bookings of one room whose [check_in, check_out)
+# ranges overlap. Other backends rely on BookingSerializer's check and the
+# unique (room, night) constraint on RoomNight.
+CONSTRAINT = 'booking_room_no_overlap'
+
+
+def add_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    # btree_gist lets the GiST index compare room_id with "=". Fails if legacy
+    # bookings already overlap: `rebuild_room_nights --check` lists them.
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(
+        f"ALTER TABLE bookings_booking ADD CONSTRAINT {CONSTRAINT} EXCLUDE USING gist "
+        f"(room_id WITH =, daterange(check_in, check_out, '[)') WITH &&) "
+        f"WHERE (status <> 'cancelled')"
+    )
+
+
+def remove_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'ALTER TABLE bookings_booking DROP CONSTRAINT IF EXISTS {CONSTRAINT}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_bookingnumber'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_constraint, remove_constraint),
+    ]
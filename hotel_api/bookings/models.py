@@ -1,7 +1,15 @@
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
 from rooms.models import Room
-import uuid
-from datetime import datetime
+
+class BookingQuerySet(models.QuerySet):
+    def overlapping(self, check_in, check_out):
+        """Bookings (not cancelled) that hold any night in [check_in, check_out)"""
+        return self.filter(
+            check_in__lt=check_out,
+            check_out__gt=check_in
+        ).exclude(status='cancelled')
+
 
 class Booking(models.Model):
     STATUS_CHOICES = [
@@ -49,21 +57,56 @@ class Booking(models.Model):
     confirmation_email_sent = models.BooleanField(default=False)
     invoice_generated = models.BooleanField(default=False)
 
+    objects = BookingQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['booking_number']),
             models.Index(fields=['email']),
             models.Index(fields=['check_in', 'check_out']),
+            models.Index(fields=['-created_at', 'id'], name='booking_created_cursor_idx'),
         ]
 
+    OCCUPANCY_FIELDS = ('room_id', 'check_in', 'check_out', 'status')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the row occupied so save() only touches RoomNight when it changes
+        if all(field in field_names for field in cls.OCCUPANCY_FIELDS):
+            instance._loaded_occupancy = instance.occupancy_key
+        return instance
+
+    @property
+    def occupancy_key(self):
+        """Room, dates and whether the booking holds its nights"""
+        return (self.room_id, self.check_in, self.check_out, self.status != 'cancelled')
+
     def save(self, *args, **kwargs):
-        if not self.booking_number:
-            # Generate unique booking number: HJ-YYYYMMDD-XXXX
-            date_str = datetime.now().strftime('%Y%m%d')
-            random_str = str(uuid.uuid4().hex[:4].upper())
-            self.booking_number = f"HJ-{date_str}-{random_str}"
-        super().save(*args, **kwargs)
+        from .occupancy import sync_room_nights
+        from .changes import record_changes
+        from .numbers import allocate_booking_numbers
+
+        adding = self._state.adding
+        previous = getattr(self, '_loaded_occupancy', None)
+        numbered = not self.booking_number
+        try:
+            with transaction.atomic():
+                if numbered:
+                    # HJ-YYYYMMDD- plus a checksummed counter, see numbers.py; taken in
+                    # this transaction so a failed insert gives its ticket back
+                    self.booking_number = allocate_booking_numbers()[0]
+                super().save(*args, **kwargs)
+                if previous != self.occupancy_key:
+                    sync_room_nights([self])
+                record_changes([self], previous=previous, adding=adding)
+        except Exception:
+            if numbered:
+                # The ticket was rolled back and may be handed out again
+                self.booking_number = ''
+            raise
+        self._loaded_occupancy = self.occupancy_key
 
     def __str__(self):
         return f"{self.booking_number} - {self.name} - {self.room.name}"
@@ -85,3 +128,62 @@ class Booking(models.Model):
         from datetime import date
         today = date.today()
         return self.check_in <= today <= self.check_out
+
+
+class RoomNight(models.Model):
+    """
+    Materialized occupancy: one row per room and night held by a booking.
+    Kept in sync by Booking.save (cancelled bookings hold no nights) and
+    removed with the booking through the cascade.
+    """
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name="nights")
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name="room_nights")
+    night = models.DateField()
+
+    class Meta:
+        ordering = ['room', 'night']
+        constraints = [
+            models.UniqueConstraint(fields=['room', 'night'], name='unique_room_night'),
+        ]
+
+    def __str__(self):
+        return f"{self.room_id} - {self.night} - {self.booking_id}"
+
+
+class BookingChange(models.Model):
+    """
+    Append-only change feed. The id is the sequence number consumers
+    resume from; booking_id is a plain column so events outlive deletions.
+    """
+    EVENT_CHOICES = [
+        ('created', 'Criada'),
+        ('updated', 'Atualizada'),
+        ('cancelled', 'Cancelada'),
+        ('deleted', 'Removida'),
+    ]
+
+    booking_id = models.BigIntegerField(db_index=True)
+    booking_number = models.CharField(max_length=20)
+    event = models.CharField(max_length=20, choices=EVENT_CHOICES)
+    # Booking fields after the change (before it, for deletions)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    # Room and dates held before the change, when they changed
+    previous = models.JSONField(encoder=DjangoJSONEncoder, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.id} {self.booking_number} {self.event}"
+
+
+class BookingNumber(models.Model):
+    """
+    Ticket table for booking numbers: each row's auto-increment id is one
+    counter value, handed out by bookings.numbers (which prunes old rows)
+    """
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return str(self.pk)
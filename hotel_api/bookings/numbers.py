@@ -0,0 +1,81 @@
+"""
+Booking number allocation
+
+Numbers look like ``HJ-YYYYMMDD-XXXXC``: the booking date, a Crockford
+base32 counter (at least 4 characters) and a Luhn mod 32 check character
+that catches any single mistyped character and any swap of neighbouring
+characters except 0/Z. The counter is the
+auto-increment id of a BookingNumber row, so concurrent allocations can
+never collide, never retry, and never wait on another transaction's row
+lock. Consecutive numbers also keep inserts into the unique index ordered.
+
+Legacy numbers (``HJ-YYYYMMDD-`` plus 4 random hex characters) stay valid
+as they are: new suffixes are at least 5 characters, so the two formats
+cannot clash.
+"""
+import re
+from django.utils import timezone
+from .models import BookingNumber
+
+# Crockford base32: no I, L, O or U
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+COUNTER_WIDTH = 4
+PRUNE_EVERY = 1000
+
+LEGACY_PATTERN = re.compile(r'^HJ-\d{8}-[0-9A-F]{4}$')
+PATTERN = re.compile(rf'^HJ-\d{{8}}-([{ALPHABET}]{{{COUNTER_WIDTH},}})([{ALPHABET}])$')
+
+
+def encode(value, width=COUNTER_WIDTH):
+    digits = ''
+    while value:
+        value, remainder = divmod(value, 32)
+        digits = ALPHABET[remainder] + digits
+    return digits.rjust(width, '0')
+
+
+def check_character(digits):
+    """
+    Luhn mod 32 check character for base32 digits
+    """
+    total = 0
+    factor = 2
+    for char in reversed(digits):
+        addend = factor * ALPHABET.index(char)
+        total += addend // 32 + addend % 32
+        factor = 3 - factor
+    return ALPHABET[-total % 32]
+
+
+def format_booking_number(counter, day):
+    digits = encode(counter)
+    return f"HJ-{day:%Y%m%d}-{digits}{check_character(digits)}"
+
+
+def allocate_booking_numbers(count=1):
+    """
+    Reserve `count` booking numbers with one insert; call it inside the
+    transaction that saves the bookings.
+
+    The counter lives in the table's sequence (AUTOINCREMENT on SQLite), not
+    in its rows, so old tickets are deleted: the allocation that crosses each
+    multiple of PRUNE_EVERY removes everything below its first ticket. Only
+    that one transaction per PRUNE_EVERY numbers touches existing rows.
+    """
+    tickets = BookingNumber.objects.bulk_create([BookingNumber() for _ in range(count)])
+    first, last = tickets[0].pk, tickets[-1].pk
+    if last // PRUNE_EVERY != (first - 1) // PRUNE_EVERY:
+        BookingNumber.objects.filter(id__lt=first).delete()
+    day = timezone.localdate()
+    return [format_booking_number(ticket.pk, day) for ticket in tickets]
+
+
+def is_valid_booking_number(number):
+    """
+    True for legacy numbers and for new numbers with a correct check character
+    """
+    number = number.strip().upper()
+    if LEGACY_PATTERN.match(number):
+        return True
+    match = PATTERN.match(number)
+    return bool(match) and check_character(match.group(1)) == match.group(2)
@@ -0,0 +1,95 @@
+"""
+Maintenance of the RoomNight occupancy table
+"""
+from .availability import expand_nights
+from .models import Booking, RoomNight
+
+
+def booking_room_nights(booking):
+    """
+    RoomNight rows a booking should hold (none when cancelled)
+    """
+    if booking.status == 'cancelled':
+        return []
+    return [
+        RoomNight(room_id=booking.room_id, booking_id=booking.pk, night=night)
+        for night in expand_nights([(booking.check_in, booking.check_out)])
+    ]
+
+
+def sync_room_nights(bookings):
+    """
+    Replace the RoomNight rows of the given (saved) bookings.
+    Must run inside the transaction that wrote the bookings; a night
+    already held by another booking raises IntegrityError.
+    """
+    RoomNight.objects.filter(booking__in=[booking.pk for booking in bookings]).delete()
+    rows = []
+    for booking in bookings:
+        rows.extend(booking_room_nights(booking))
+    RoomNight.objects.bulk_create(rows)
+
+
+def expected_room_nights():
+    """
+    Yield (room_id, night, booking_id) for every night held according to Booking,
+    oldest booking first so it wins when legacy rows overlap
+    """
+    bookings = Booking.objects.exclude(status='cancelled').order_by('created_at', 'id').values_list(
+        'id', 'room_id', 'check_in', 'check_out'
+    )
+    for booking_id, room_id, check_in, check_out in bookings.iterator(chunk_size=2000):
+        for night in expand_nights([(check_in, check_out)]):
+            yield room_id, night, booking_id
+
+
+def occupancy_drift():
+    """
+    Compare RoomNight against Booking.
+    Returns (missing, extra, conflicts): rows that should exist but don't,
+    rows that exist but shouldn't, and expected rows that clash with an
+    older booking on the same room and night.
+    """
+    expected = {}
+    conflicts = []
+    for room_id, night, booking_id in expected_room_nights():
+        if (room_id, night) in expected:
+            conflicts.append((room_id, night, booking_id))
+        else:
+            expected[(room_id, night)] = booking_id
+
+    actual = {
+        (room_id, night): booking_id
+        for room_id, night, booking_id in RoomNight.objects.values_list(
+            'room_id', 'night', 'booking_id'
+        ).iterator(chunk_size=2000)
+    }
+
+    missing = [(key[0], key[1], value) for key, value in expected.items() if actual.get(key) != value]
+    extra = [(key[0], key[1], value) for key, value in actual.items() if expected.get(key) != value]
+    return missing, extra, conflicts
+
+
+def rebuild_room_nights(batch_size=2000):
+    """
+    Rebuild RoomNight from Booking. Returns (rows written, conflicts skipped).
+    Call inside a transaction.
+    """
+    RoomNight.objects.all().delete()
+    seen = set()
+    conflicts = []
+    batch = []
+    written = 0
+    for room_id, night, booking_id in expected_room_nights():
+        if (room_id, night) in seen:
+            conflicts.append((room_id, night, booking_id))
+            continue
+        seen.add((room_id, night))
+        batch.append(RoomNight(room_id=room_id, night=night, booking_id=booking_id))
+        if len(batch) >= batch_size:
+            RoomNight.objects.bulk_create(batch)
+            written += len(batch)
+            batch = []
+    RoomNight.objects.bulk_create(batch)
+    written += len(batch)
+    return written, conflicts
@@ -0,0 +1,19 @@
+from rest_framework.pagination import CursorPagination
+
+
+class BookingCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (-created_at, id), so the cost of a page does not
+    depend on how deep it is. Opt-in: plain list requests without `cursor`
+    or `page_size` keep returning the full array for existing clients.
+    """
+    ordering = ('-created_at', 'id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
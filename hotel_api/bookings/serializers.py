@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import Booking
+from contextlib import contextmanager
+from django.db import IntegrityError, transaction
+from .models import Booking, RoomNight
 from rooms.models import Room
 from datetime import date
 from .utils import calculate_booking_total
@@ -55,18 +57,22 @@ class BookingSerializer(serializers.ModelSerializer):
                 {"guests": "Número de hóspedes deve ser entre 1 e 6."}
             )
 
-        # Check for overlapping bookings (exclude cancelled ones)
-        overlapping = Booking.objects.filter(
-            room=room,
-            check_in__lt=check_out,
-            check_out__gt=check_in
-        ).exclude(status='cancelled')
+        # Check the occupancy table for nights already held (cancelled bookings hold none)
+        self.check_room_nights(room, check_in, check_out)
+
+        return data
+    
+    def check_room_nights(self, room, check_in, check_out):
+        """Raise a conflict error if any night in [check_in, check_out) is already held"""
+        taken_nights = RoomNight.objects.filter(room=room, night__gte=check_in, night__lt=check_out)
+        overlapping = Booking.objects.overlapping(check_in, check_out).filter(room=room)
         
         # If updating, exclude current booking
         if self.instance:
+            taken_nights = taken_nights.exclude(booking=self.instance)
             overlapping = overlapping.exclude(id=self.instance.id)
 
-        if overlapping.exists():
+        if taken_nights.exists():
             reserved_ranges = [
                 {
                     "check_in": str(b.check_in),
@@ -80,9 +86,26 @@ class BookingSerializer(serializers.ModelSerializer):
                 "reserved": reserved_ranges,
                 "message": "Por favor, escolha outras datas disponíveis."
             })
-
-        return data
     
+    @contextmanager
+    def room_lock(self, room, check_in, check_out):
+        """
+        Run a booking write under a per-room lock.
+        The Room row is locked with select_for_update (a no-op on SQLite,
+        which serializes writers itself) and availability is re-checked
+        inside the transaction. If a concurrent writer still claims a night
+        first, the unique (room, night) constraint on RoomNight rejects the
+        loser, which is reported as the usual conflict error.
+        """
+        try:
+            with transaction.atomic():
+                Room.objects.select_for_update().get(pk=room.pk)
+                self.check_room_nights(room, check_in, check_out)
+                yield
+        except IntegrityError:
+            self.check_room_nights(room, check_in, check_out)
+            raise
+
     def create(self, validated_data):
         # Calculate total price
         room = validated_data['room']
@@ -92,7 +115,16 @@ class BookingSerializer(serializers.ModelSerializer):
         validated_data['total_price'] = total_price
         validated_data['status'] = 'confirmed'
         
-        return super().create(validated_data)
+        with self.room_lock(room, check_in, check_out):
+            return super().create(validated_data)
+    
+    def update(self, instance, validated_data):
+        room = validated_data.get('room', instance.room)
+        check_in = validated_data.get('check_in', instance.check_in)
+        check_out = validated_data.get('check_out', instance.check_out)
+        
+        with self.room_lock(room, check_in, check_out):
+            return super().update(instance, validated_data)
 
 
 class BookingListSerializer(serializers.ModelSerializer):
@@ -102,3 +134,100 @@ class BookingListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Booking
         fields = ['id', 'booking_number', 'room_name', 'name', 'check_in', 'check_out', 'status', 'total_price']
+
+
+# Fast read path: build the exact BookingSerializer output from .values() rows,
+# skipping per-row ModelSerializer field resolution and model instantiation.
+# The DRF fields below are only used to format values identically.
+_datetime_field = serializers.DateTimeField()
+_decimal_field = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+BOOKING_VALUE_FIELDS = [
+    'id', 'booking_number', 'room_id', 'room__name', 'room__room_type',
+    'name', 'email', 'phone', 'guests', 'check_in', 'check_out',
+    'status', 'payment_status', 'total_price', 'special_requests',
+    'created_at', 'updated_at', 'confirmation_email_sent', 'invoice_generated',
+]
+
+
+def format_datetime(value, tz):
+    """
+    DRF DateTimeField (ISO 8601) formatting with the timezone resolved once per request
+    """
+    if value is None:
+        return None
+    if tz is not None:
+        value = value.astimezone(tz)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def booking_row_data(row, today, tz):
+    """
+    Format one BOOKING_VALUE_FIELDS row like BookingSerializer
+    """
+    check_in = row['check_in']
+    check_out = row['check_out']
+    return {
+        'id': row['id'],
+        'booking_number': row['booking_number'],
+        'room': row['room_id'],
+        'room_name': row['room__name'],
+        'room_type': row['room__room_type'],
+        'name': row['name'],
+        'email': row['email'],
+        'phone': row['phone'],
+        'guests': row['guests'],
+        'check_in': check_in.isoformat(),
+        'check_out': check_out.isoformat(),
+        'nights': (check_out - check_in).days,
+        'status': row['status'],
+        'payment_status': row['payment_status'],
+        'total_price': _decimal_field.to_representation(row['total_price']),
+        'special_requests': row['special_requests'],
+        'created_at': format_datetime(row['created_at'], tz),
+        'updated_at': format_datetime(row['updated_at'], tz),
+        'is_upcoming': check_in > today,
+        'is_active': check_in <= today <= check_out,
+        'confirmation_email_sent': row['confirmation_email_sent'],
+        'invoice_generated': row['invoice_generated'],
+    }
+
+
+def fast_booking_data(queryset, today=None):
+    """
+    Read-only equivalent of BookingSerializer(queryset, many=True).data
+    """
+    today = today or date.today()
+    tz = _datetime_field.default_timezone()
+    return [booking_row_data(row, today, tz) for row in queryset.values(*BOOKING_VALUE_FIELDS)]
+
+
+# Column order of the CSV export, i.e. booking_row_data keys
+BOOKING_EXPORT_COLUMNS = [
+    'id', 'booking_number', 'room', 'room_name', 'room_type', 'name', 'email', 'phone', 'guests',
+    'check_in', 'check_out', 'nights', 'status', 'payment_status', 'total_price', 'special_requests',
+    'created_at', 'updated_at', 'is_upcoming', 'is_active', 'confirmation_email_sent', 'invoice_generated',
+]
+
+
+def iter_booking_data(queryset, chunk_size, today=None):
+    """
+    Generator version of fast_booking_data: reads `chunk_size` rows per
+    round trip and never holds the whole result in memory
+    """
+    today = today or date.today()
+    tz = _datetime_field.default_timezone()
+    for row in queryset.values(*BOOKING_VALUE_FIELDS).iterator(chunk_size=chunk_size):
+        yield booking_row_data(row, today, tz)
+
+
+async def afast_booking_data(queryset, today=None):
+    """
+    fast_booking_data for async views, iterating the queryset with the async ORM
+    """
+    today = today or date.today()
+    tz = _datetime_field.default_timezone()
+    return [booking_row_data(row, today, tz) async for row in queryset.values(*BOOKING_VALUE_FIELDS)]
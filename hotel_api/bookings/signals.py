@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete
+from django.dispatch import Signal, receiver
+from .changes import record_changes
+from .models import Booking
+
+# Sent with bookings=[...] after Booking.objects.bulk_create, which skips
+# post_save, inside the same transaction (see bookings.bulk)
+bookings_bulk_created = Signal()
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, **kwargs):
+    # Runs inside the deletion transaction, cascades from Room included
+    record_changes([instance], event='deleted')
@@ -0,0 +1,88 @@
+"""
+Server-Sent Events endpoint for live room-night availability
+
+Plain async Django view (DRF views are sync only). Served through
+hotel_api.asgi, each open stream is a coroutine waiting on its queue.
+"""
+import asyncio
+import json
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from .live import availability_events, get_broker
+from .models import BookingChange
+
+# Reconnects further behind than this get a resync event instead of a replay
+REPLAY_LIMIT = 1000
+
+# Tells the client to refetch availability: events were missed
+RESYNC = 'event: resync\ndata: {}\n\n'
+
+
+def format_event(event):
+    return f"id: {event['seq']}\nevent: availability\ndata: {json.dumps(event)}\n\n"
+
+
+async def event_stream(rooms, since):
+    broker = get_broker()
+    heartbeat = getattr(settings, 'AVAILABILITY_STREAM_HEARTBEAT', 15)
+    # Subscribe before replaying so nothing committed in between is lost
+    subscription = broker.subscribe(rooms)
+    try:
+        yield 'retry: 3000\n\n'
+
+        last_seq = 0
+        if since is not None and getattr(settings, 'CHANGE_FEED_SETTLE', 0):
+            # Ids do not commit in order on this backend (see bookings/changes.py):
+            # a change below `since` may have committed after the client saw it
+            yield RESYNC
+        elif since is not None:
+            last_seq = since
+            changes = [change async for change in BookingChange.objects.filter(id__gt=since).order_by('id')[:REPLAY_LIMIT + 1]]
+            if len(changes) > REPLAY_LIMIT:
+                yield RESYNC
+            else:
+                for change in changes:
+                    for event in availability_events(change):
+                        if not rooms or event['room'] in rooms:
+                            yield format_event(event)
+            if changes:
+                last_seq = changes[-1].id
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+
+            if subscription.overflowed:
+                subscription.drain()
+                yield RESYNC
+                continue
+
+            # Already sent during the replay
+            if event['seq'] <= last_seq:
+                continue
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def availability_stream(request):
+    """
+    Stream availability changes as Server-Sent Events
+    Query params: rooms (optional, comma separated ids), since (optional, last event id;
+    the Last-Event-ID header sent by EventSource on reconnect takes precedence)
+    """
+    try:
+        rooms = {int(i) for i in request.GET['rooms'].split(',')} if request.GET.get('rooms') else None
+        since = request.headers.get('Last-Event-ID') or request.GET.get('since')
+        since = int(since) if since else None
+    except ValueError:
+        return JsonResponse({'error': 'Invalid rooms or since parameter'}, status=400)
+
+    response = StreamingHttpResponse(event_stream(rooms, since), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx and similar proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
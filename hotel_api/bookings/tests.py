@@ -1,3 +1,462 @@
-from django.test import TestCase
+import threading
+from io import StringIO
+from datetime import date, timedelta
+from unittest import mock, skipUnless
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, models, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from accounts.models import User
+from rooms.models import Room
+from .availability import overlapping_pairs, room_availability_data
+from .bulk import MAX_IMPORT_ROWS
+from .changes import changes_since, latest_seq
+from .filters import filter_bookings
+from .models import Booking, BookingChange, BookingNumber, RoomNight
+from .numbers import ALPHABET, allocate_booking_numbers, format_booking_number, is_valid_booking_number
+from .occupancy import occupancy_drift
+from .serializers import BookingSerializer
+from .utils import invoice_context, invoice_etag
 
-# Create your tests here.
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Parallel creates for the same room and nights must produce exactly one booking"""
+
+    threads = 8
+
+    def setUp(self):
+        self.room = Room.objects.create(
+            name="Quarto Deluxe", room_type="deluxe", description="Teste", price_per_night=150000
+        )
+
+    def create_in_parallel(self, payloads):
+        barrier = threading.Barrier(len(payloads))
+        results = [None] * len(payloads)
+
+        def worker(index, payload):
+            try:
+                serializer = BookingSerializer(data=payload)
+                serializer.is_valid(raise_exception=True)
+                barrier.wait()
+                serializer.save()
+                results[index] = 'created'
+            except serializers.ValidationError:
+                results[index] = 'conflict'
+            except Exception as e:
+                results[index] = repr(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(i, p)) for i, p in enumerate(payloads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return results
+
+    def payload(self, offset, nights):
+        check_in = date.today() + timedelta(days=offset)
+        return {
+            'room': self.room.id,
+            'name': 'Hóspede',
+            'email': 'hospede@example.com',
+            'guests': 1,
+            'check_in': str(check_in),
+            'check_out': str(check_in + timedelta(days=nights)),
+        }
+
+    def test_one_winner_for_identical_requests(self):
+        results = self.create_in_parallel([self.payload(10, 3)] * self.threads)
+
+        self.assertEqual(results.count('created'), 1, results)
+        self.assertEqual(results.count('conflict'), self.threads - 1, results)
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(RoomNight.objects.count(), 3)
+
+    def test_one_winner_per_night_for_staggered_requests(self):
+        # Each request overlaps its neighbours by one night
+        results = self.create_in_parallel([self.payload(10 + i, 2) for i in range(self.threads)])
+
+        self.assertNotIn(None, results)
+        self.assertEqual(set(results) - {'created', 'conflict'}, set(), results)
+        nights = list(RoomNight.objects.values_list('night', flat=True))
+        self.assertEqual(len(nights), len(set(nights)))
+        self.assertEqual(len(nights), 2 * results.count('created'))
+
+
+class OverlapConstraintTests(TestCase):
+    """
+    Overlap rules enforced below the serializer. Run the suite on both
+    backends: `python manage.py test` (SQLite) and
+    `DATABASE_URL=postgres://localhost/hotel_jan python manage.py test`.
+    """
+
+    def setUp(self):
+        self.room = Room.objects.create(
+            name="Quarto Standard", room_type="standard", description="Teste", price_per_night=100000
+        )
+
+    def booking(self, offset, nights, **fields):
+        check_in = date.today() + timedelta(days=offset)
+        return Booking(
+            room=self.room, name='Hóspede', email='hospede@example.com', check_in=check_in,
+            check_out=check_in + timedelta(days=nights), status=fields.pop('status', 'confirmed'), **fields
+        )
+
+    def test_overlapping_booking_is_rejected(self):
+        self.booking(10, 3).save()
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.booking(12, 2).save()
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_back_to_back_stays_are_allowed(self):
+        self.booking(10, 3).save()
+        self.booking(13, 2).save()
+
+        self.assertEqual(RoomNight.objects.count(), 5)
+
+    def test_cancelled_booking_holds_no_nights(self):
+        self.booking(10, 3, status='cancelled').save()
+        active = self.booking(10, 3)
+        active.save()
+
+        self.assertEqual(list(Booking.objects.overlapping(active.check_in, active.check_out)), [active])
+
+    @skipUnless(connection.vendor == 'postgresql', "exclusion constraint is PostgreSQL only")
+    def test_exclusion_constraint_rejects_rows_that_skip_save(self):
+        # bulk_create writes no RoomNight rows: only the booking table constraint can catch this
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Booking.objects.bulk_create([
+                self.booking(10, 3, booking_number='HJ-TEST-1'),
+                self.booking(11, 1, booking_number='HJ-TEST-2'),
+            ])
+
+
+class RebuildRoomNightsTests(TestCase):
+    """rebuild_room_nights --check reports drift and a rebuild repairs it"""
+
+    def setUp(self):
+        self.room = Room.objects.create(name="Quarto", room_type="standard", description="Teste", price_per_night=100)
+        self.check_in = date.today() + timedelta(days=10)
+        self.first = self.booking(0, 3)
+        self.second = self.booking(5, 2)
+
+    def booking(self, offset, nights, **fields):
+        check_in = self.check_in + timedelta(days=offset)
+        return Booking.objects.create(room=self.room, name='Hóspede', email='a@example.com', check_in=check_in,
+                                      check_out=check_in + timedelta(days=nights), status='confirmed', **fields)
+
+    def command(self, *args):
+        out = StringIO()
+        call_command('rebuild_room_nights', *args, stdout=out)
+        return out.getvalue()
+
+    def test_in_sync_after_saves(self):
+        self.assertEqual(occupancy_drift(), ([], [], []))
+        self.assertIn("in sync", self.command('--check'))
+
+    def test_check_fails_on_drift_and_rebuild_restores_sync(self):
+        RoomNight.objects.filter(booking=self.first, night=self.check_in).delete()
+        RoomNight.objects.filter(booking=self.second).update(night=models.F('night') + timedelta(days=10))
+        Booking.objects.filter(pk=self.second.pk).update(status='cancelled')
+
+        missing, extra, conflicts = occupancy_drift()
+        self.assertEqual(missing, [(self.room.id, self.check_in, self.first.id)])
+        self.assertEqual(len(extra), 2)
+        self.assertEqual(conflicts, [])
+        with self.assertRaises(CommandError):
+            self.command('--check')
+
+        self.assertIn("Rebuilt 3 room nights", self.command())
+        self.assertEqual(occupancy_drift(), ([], [], []))
+        self.assertEqual(set(RoomNight.objects.values_list('booking_id', flat=True)), {self.first.id})
+        self.assertIn("in sync", self.command('--check'))
+
+    def test_legacy_overlap_keeps_the_oldest_booking(self):
+        # Written before RoomNight existed: bypasses Booking.save and its occupancy sync
+        [legacy] = Booking.objects.bulk_create([Booking(
+            room=self.room, name='Hóspede', email='b@example.com', booking_number='HJ-LEGACY-1', status='confirmed',
+            check_in=self.check_in + timedelta(days=2), check_out=self.check_in + timedelta(days=6),
+        )])
+        clashes = [(self.room.id, self.check_in + timedelta(days=2), legacy.id),
+                   (self.room.id, self.check_in + timedelta(days=5), legacy.id)]
+
+        missing, extra, conflicts = occupancy_drift()
+        self.assertEqual(conflicts, clashes)
+        self.assertEqual(len(missing), 2)
+        with self.assertRaises(CommandError):
+            self.command('--check')
+
+        output = self.command()
+        self.assertIn("Rebuilt 7 room nights", output)
+        self.assertEqual(output.count("Skipped room"), 2)
+        self.assertEqual(occupancy_drift(), ([], [], clashes))
+        self.assertEqual(RoomNight.objects.filter(booking=legacy).count(), 2)
+        # Conflicts are reported but are not drift
+        self.assertIn("in sync", self.command('--check'))
+
+
+class RoomAvailabilityDataTests(TestCase):
+
+    def test_compact_count_is_clipped_to_the_window(self):
+        room = Room(id=1, name="Quarto")
+        bookings = [
+            {'check_in': date(2025, 9, 28), 'check_out': date(2025, 10, 3), 'booking_number': 'HJ-20250901-A1B2'},
+            {'check_in': date(2025, 10, 30), 'check_out': date(2025, 11, 4), 'booking_number': 'HJ-20250901-C3D4'},
+        ]
+
+        compact = room_availability_data(room, date(2025, 10, 1), date(2025, 11, 1), bookings, compact=True)
+        full = room_availability_data(room, date(2025, 10, 1), date(2025, 11, 1), bookings)
+
+        self.assertEqual(compact['occupied_ranges'], [
+            {'start': '2025-10-01', 'end': '2025-10-03'}, {'start': '2025-10-30', 'end': '2025-11-01'},
+        ])
+        self.assertEqual(compact['total_unavailable_days'], 4)
+        self.assertEqual(full['total_unavailable_days'], len(full['unavailable_dates']))
+
+
+class BookingOwnershipTests(TestCase):
+    """Guests reach a single booking only with its number and email"""
+
+    def setUp(self):
+        room = Room.objects.create(name="Quarto", room_type="standard", description="Teste", price_per_night=100)
+        check_in = date.today() + timedelta(days=10)
+        self.booking = Booking.objects.create(room=room, name='Hóspede', email='Hospede@Example.com', phone='923000000',
+                                              check_in=check_in, check_out=check_in + timedelta(days=2),
+                                              total_price=200, status='confirmed')
+        self.proof = {'booking_number': self.booking.booking_number.lower(), 'email': ' hospede@example.com'}
+        self.client = APIClient()
+
+    def test_lookups_need_the_booking_number_and_email(self):
+        url = f'/api/bookings/{self.booking.pk}/'
+        wrong = {**self.proof, 'email': 'outro@example.com'}
+        for params in [{}, {'email': self.proof['email']}, wrong]:
+            self.assertEqual(self.client.get(url, params).status_code, 404, params)
+            self.assertEqual(self.client.get(url + 'invoice/', params).status_code, 404, params)
+
+        response = self.client.get(url, self.proof)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['phone'], '923000000')
+        self.assertEqual(self.client.get(url + 'invoice/', self.proof)['Content-Type'], 'application/pdf')
+
+    def test_cancel_needs_the_booking_number_and_email(self):
+        url = f'/api/bookings/{self.booking.pk}/cancel/'
+
+        self.assertEqual(self.client.post(url).status_code, 404)
+        self.assertEqual(self.client.post(url + f'?email={self.proof["email"]}').status_code, 404)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'confirmed')
+
+        self.assertEqual(self.client.post(url, self.proof, format='json').status_code, 200)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'cancelled')
+
+    def test_staff_skip_the_ownership_check(self):
+        staff = User.objects.create_user(username='recepcao', password='senha-forte-123', role=User.Role.STAFF)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=staff).key}')
+
+        self.assertEqual(self.client.get(f'/api/bookings/{self.booking.pk}/').status_code, 200)
+        self.assertEqual(self.client.post(f'/api/bookings/{self.booking.pk}/resend_confirmation/').status_code, 200)
+        self.assertEqual(self.client.post(f'/api/bookings/{self.booking.pk}/cancel/').status_code, 200)
+
+
+class InvoiceContextTests(TestCase):
+
+    def test_etag_is_stable_across_days(self):
+        room = Room.objects.create(name="Quarto", room_type="standard", description="Teste", price_per_night=100)
+        check_in = date.today() + timedelta(days=10)
+        booking = Booking.objects.create(room=room, name='Hóspede', email='a@example.com', check_in=check_in,
+                                         check_out=check_in + timedelta(days=2), total_price=200)
+        context = invoice_context(booking)
+
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(days=3)):
+            self.assertEqual(invoice_etag(invoice_context(booking)), invoice_etag(context))
+        self.assertEqual(context['issue_date'], timezone.localtime(booking.created_at).strftime('%d/%m/%Y'))
+
+
+class OverlappingPairsTests(TestCase):
+
+    def test_pairs_in_start_order(self):
+        day = date(2030, 1, 1)
+        intervals = [
+            (day + timedelta(days=4), day + timedelta(days=6), 'c'),
+            (day, day + timedelta(days=3), 'a'),
+            (day + timedelta(days=2), day + timedelta(days=5), 'b'),
+            # Touching a check-out is not an overlap
+            (day + timedelta(days=6), day + timedelta(days=8), 'd'),
+        ]
+        self.assertEqual(sorted(overlapping_pairs(intervals)), [('a', 'b'), ('b', 'c')])
+
+
+class BulkImportTests(TestCase):
+    """POST /api/bookings/bulk/ (all or nothing)"""
+
+    def setUp(self):
+        self.rooms = [
+            Room.objects.create(name=f"Quarto {i}", room_type="standard", description="Teste", price_per_night=100)
+            for i in range(3)
+        ]
+        self.check_in = date.today() + timedelta(days=20)
+        self.existing = Booking.objects.create(room=self.rooms[0], name='Hóspede', email='a@example.com',
+                                               check_in=self.check_in, check_out=self.check_in + timedelta(days=2),
+                                               status='confirmed')
+        manager = User.objects.create_user(username='gerente', password='senha-forte-123', role=User.Role.MANAGER)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=manager).key}')
+
+    def post(self, rows, **body):
+        defaults = {'name': 'Grupo', 'email': 'grupo@example.com', 'guests': 2,
+                    'check_in': str(self.check_in + timedelta(days=10)), 'check_out': str(self.check_in + timedelta(days=13))}
+        return self.client.post('/api/bookings/bulk/', {'bookings': rows, 'defaults': defaults, **body}, format='json')
+
+    def test_every_problem_is_reported_at_once(self):
+        response = self.post([
+            {'room': self.rooms[0].id, 'check_in': str(self.check_in + timedelta(days=1))},  # existing booking
+            {'room': self.rooms[1].id},
+            {'room': self.rooms[1].id, 'check_in': str(self.check_in + timedelta(days=12))},  # row 1
+            {'room': self.rooms[2].id, 'guests': 9},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        body = response.json()
+        self.assertEqual([error['row'] for error in body['errors']], [3])
+        self.assertIn('guests', body['errors'][0]['errors'])
+        self.assertEqual({conflict['row']: conflict['conflicts_with'] for conflict in body['conflicts']}, {
+            0: [{'booking_number': self.existing.booking_number}],
+            1: [{'row': 2}],
+            2: [{'row': 1}],
+        })
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_one_invalid_row_creates_nothing(self):
+        changes, nights = BookingChange.objects.count(), RoomNight.objects.count()
+
+        response = self.post([{'room': self.rooms[1].id}, {'room': self.rooms[2].id, 'email': 'not-an-email'}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual((BookingChange.objects.count(), RoomNight.objects.count()), (changes, nights))
+
+    def test_dry_run_creates_nothing(self):
+        response = self.post([{'room': room.id} for room in self.rooms], dry_run=True)
+
+        self.assertEqual(response.json(), {'valid': 3})
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_row_limit(self):
+        response = self.post([{'room': self.rooms[1].id}] * (MAX_IMPORT_ROWS + 1))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('bookings', response.json())
+
+    def test_import_writes_room_nights_and_changes(self):
+        changes = BookingChange.objects.count()
+
+        response = self.post([{'room': room.id} for room in self.rooms])
+
+        self.assertEqual(response.status_code, 201)
+        numbers = [booking['booking_number'] for booking in response.json()['bookings']]
+        created = Booking.objects.filter(booking_number__in=numbers)
+        self.assertEqual(created.count(), 3)
+        self.assertTrue(all(is_valid_booking_number(number) for number in numbers))
+        self.assertEqual(RoomNight.objects.filter(booking__in=created).count(), 3 * 3)
+        self.assertEqual(
+            list(BookingChange.objects.filter(id__gt=changes).values_list('booking_number', 'event')),
+            [(number, 'created') for number in sorted(numbers, key=lambda n: created.get(booking_number=n).id)],
+        )
+        # A second import of the same stays clashes with the first
+        self.assertEqual(len(self.post([{'room': room.id} for room in self.rooms]).json()['conflicts']), 3)
+
+
+class BookingNumberTests(TestCase):
+
+    def counter(self, number):
+        value = 0
+        for char in number.split('-')[2][:-1]:
+            value = value * 32 + ALPHABET.index(char)
+        return value
+
+    def test_check_character_round_trip(self):
+        day = date(2025, 10, 12)
+        for counter in [0, 1, 31, 32, 1023, 32 ** 4, 32 ** 7 - 1]:
+            number = format_booking_number(counter, day)
+            self.assertTrue(is_valid_booking_number(number), number)
+            self.assertTrue(is_valid_booking_number(number.lower()), number)
+            self.assertEqual(self.counter(number), counter)
+
+            # Any single mistyped character is caught
+            prefix, suffix = number[:12], number[12:]
+            for position, char in enumerate(suffix):
+                for other in ALPHABET.replace(char, ''):
+                    typo = prefix + suffix[:position] + other + suffix[position + 1:]
+                    self.assertFalse(is_valid_booking_number(typo), typo)
+
+    def test_legacy_and_malformed_numbers(self):
+        self.assertTrue(is_valid_booking_number('HJ-20251012-A1B2'))
+        for number in ['', 'HJ-20251012', 'HJ-2025101-0000A', 'XX-20251012-00010', 'HJ-20251012-00I10']:
+            self.assertFalse(is_valid_booking_number(number), number)
+
+    def test_allocation_is_consecutive(self):
+        numbers = allocate_booking_numbers(3) + allocate_booking_numbers()
+        counters = [self.counter(number) for number in numbers]
+
+        self.assertEqual(counters, list(range(counters[0], counters[0] + 4)))
+        self.assertTrue(all(is_valid_booking_number(number) for number in numbers))
+
+    @mock.patch('bookings.numbers.PRUNE_EVERY', 5)
+    def test_old_tickets_are_pruned_without_reusing_numbers(self):
+        counters = [self.counter(allocate_booking_numbers()[0]) for _ in range(12)]
+        counters.append(self.counter(allocate_booking_numbers(4)[0]))
+
+        self.assertEqual(counters, sorted(set(counters)))
+        self.assertLessEqual(BookingNumber.objects.count(), 9)
+
+    def test_failed_save_gives_the_number_back(self):
+        room = Room.objects.create(name="Quarto", room_type="standard", description="Teste", price_per_night=100)
+        check_in = date.today() + timedelta(days=10)
+        Booking(room=room, name='Hóspede', email='a@example.com', check_in=check_in,
+                check_out=check_in + timedelta(days=2), status='confirmed').save()
+        tickets = BookingNumber.objects.count()
+
+        clash = Booking(room=room, name='Hóspede', email='b@example.com', check_in=check_in,
+                        check_out=check_in + timedelta(days=1), status='confirmed')
+        with self.assertRaises(IntegrityError):
+            clash.save()
+        self.assertEqual(clash.booking_number, '')
+        self.assertEqual(BookingNumber.objects.count(), tickets)
+
+    def test_filter_rejects_invalid_numbers(self):
+        number = format_booking_number(40, date(2025, 10, 12))
+
+        self.assertIn(f"= {number} ", str(filter_bookings(Booking.objects.all(), {'booking_number': number.lower()}).query))
+        with self.assertRaises(serializers.ValidationError):
+            filter_bookings(Booking.objects.all(), {'booking_number': number[:-1] + ('0' if number[-1] != '0' else '1')})
+
+
+class ChangeFeedSettleTests(TestCase):
+    """Where ids may commit out of order, changes are only served once settled"""
+
+    def setUp(self):
+        room = Room.objects.create(name="Quarto", room_type="standard", description="Teste", price_per_night=100)
+        check_in = date.today() + timedelta(days=10)
+        Booking.objects.create(room=room, name='Hóspede', email='a@example.com', check_in=check_in,
+                               check_out=check_in + timedelta(days=2), status='confirmed')
+        self.change = BookingChange.objects.get()
+
+    @override_settings(CHANGE_FEED_SETTLE=0)
+    def test_unsettled_feed_serves_changes_immediately(self):
+        self.assertEqual(latest_seq(), self.change.id)
+        self.assertEqual([change['id'] for change in changes_since(0, 10)], [self.change.id])
+
+    @override_settings(CHANGE_FEED_SETTLE=5)
+    def test_recent_changes_are_held_back(self):
+        self.assertEqual(latest_seq(), 0)
+        self.assertEqual(changes_since(0, 10), [])
+
+        BookingChange.objects.update(created_at=timezone.now() - timedelta(seconds=6))
+        self.assertEqual(latest_seq(), self.change.id)
+        self.assertEqual([change['id'] for change in changes_since(0, 10)], [self.change.id])
@@ -1,7 +1,16 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 from .views import BookingViewSet
+from .sse import availability_stream
+from . import async_views
 
 router = DefaultRouter()
 router.register(r"bookings", BookingViewSet)
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path("availability/stream/", availability_stream, name="availability-stream"),
+    # Async read paths (served through hotel_api.asgi)
+    path("async/bookings/room_availability/", async_views.room_availability, name="async-room-availability"),
+    path("async/bookings/my_bookings/", async_views.my_bookings, name="async-my-bookings"),
+    path("async/bookings/upcoming/", async_views.upcoming, name="async-upcoming"),
+]
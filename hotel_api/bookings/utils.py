@@ -1,27 +1,51 @@
 """
 Utility functions for booking management
 """
-from django.core.mail import EmailMultiAlternatives
+from django.core.cache import caches
 from django.template.loader import render_to_string
-from django.conf import settings
+from django.utils import timezone
+from notifications.outbox import enqueue_emails, outbound_email
+from pricing.engine import quote_total
 from io import BytesIO
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
-from datetime import datetime
+from functools import lru_cache
+import hashlib
+import json
 
 
-def send_booking_confirmation_email(booking):
+def booking_confirmation_email(booking):
     """
-    Send booking confirmation email to guest
+    Unsaved outbox message confirming a booking to the guest
     """
     subject = f'Confirmação de Reserva - Hotel Jan #{booking.booking_number}'
-    from_email = settings.DEFAULT_FROM_EMAIL
-    to_email = booking.email
-    
+    return outbound_email(subject, booking.email, html_body=render_booking_confirmation_html(booking), booking=booking)
+
+
+def queue_booking_confirmation_email(booking):
+    """
+    Queue booking confirmation email to guest in the outbox
+    """
+    email = booking_confirmation_email(booking)
+    email.save()
+    return email
+
+
+def queue_booking_confirmation_emails(bookings):
+    """
+    Queue confirmation emails for many bookings with one insert
+    """
+    return enqueue_emails([booking_confirmation_email(booking) for booking in bookings])
+
+
+def render_booking_confirmation_html(booking):
+    """
+    Render the HTML body of the booking confirmation email
+    """
     # Context for email template
     context = {
         'booking': booking,
@@ -136,68 +160,157 @@ def send_booking_confirmation_email(booking):
     </html>
     """
     
-    # Create email
-    email = EmailMultiAlternatives(subject, '', from_email, [to_email])
-    email.attach_alternative(html_content, "text/html")
-    
-    try:
-        email.send()
-        return True
-    except Exception as e:
-        print(f"Error sending email: {e}")
-        return False
+    return html_content
+
+
+@lru_cache(maxsize=None)
+def invoice_styles():
+    """
+    Paragraph styles for invoices, built once per process
+    """
+    styles = getSampleStyleSheet()
+    return {
+        'normal': styles['Normal'],
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#EAB308'),
+            spaceAfter=30,
+            alignment=TA_CENTER
+        ),
+        'heading': ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=14,
+            textColor=colors.HexColor('#CA8A04'),
+            spaceAfter=12,
+        ),
+        'footer': ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=8,
+            textColor=colors.grey,
+            alignment=TA_CENTER
+        ),
+    }
+
+
+def invoice_context(booking):
+    """
+    Every value printed on the invoice, as plain strings.
+    Its hash identifies a rendered PDF, so any change to the booking or
+    room price produces a new cache entry. The issue date is the booking
+    date, so the same invoice keeps its hash (and ETag) from day to day.
+    """
+    return {
+        'booking_number': booking.booking_number,
+        'issue_date': timezone.localtime(booking.created_at).strftime('%d/%m/%Y'),
+        'name': booking.name,
+        'email': booking.email,
+        'phone': booking.phone,
+        'room_name': booking.room.name,
+        'check_in': booking.check_in.strftime('%d/%m/%Y'),
+        'check_out': booking.check_out.strftime('%d/%m/%Y'),
+        'nights': str(booking.nights),
+        'price_per_night': f'Kz {float(booking.room.price_per_night):,.2f}',
+        'total_price': f'Kz {booking.total_price:,.2f}',
+        'payment_status': booking.get_payment_status_display(),
+    }
+
+
+def invoice_etag(context):
+    """
+    Content hash of an invoice context
+    """
+    payload = json.dumps(context, sort_keys=True).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+def get_invoice_pdf(booking):
+    """
+    Return (pdf, etag) for a booking, rendering only on a cache miss
+    """
+    context = invoice_context(booking)
+    etag = invoice_etag(context)
+    cache = caches['invoices']
+    pdf = cache.get(etag)
+    if pdf is None:
+        pdf = render_invoice_pdf(context)
+        cache.set(etag, pdf)
+    return pdf, etag
 
 
 def generate_invoice_pdf(booking):
     """
     Generate PDF invoice for booking
     """
+    return render_invoice_pdf(invoice_context(booking))
+
+
+def render_invoice_pdf(invoice):
+    """
+    Render an invoice context (see invoice_context) to PDF bytes
+    """
     buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4,
+    build_invoice_document(buffer, [invoice])
+    
+    # Get the value of the BytesIO buffer
+    pdf = buffer.getvalue()
+    buffer.close()
+    
+    return pdf
+
+
+def build_invoice_document(output, invoices):
+    """
+    Write one or more invoice contexts to a file-like object as a single
+    PDF, each invoice starting on a new page
+    """
+    doc = SimpleDocTemplate(output, pagesize=A4,
                            rightMargin=72, leftMargin=72,
                            topMargin=72, bottomMargin=18)
     
-    # Container for the 'Flowable' objects
     elements = []
+    for index, invoice in enumerate(invoices):
+        if index:
+            elements.append(PageBreak())
+        elements.extend(invoice_flowables(invoice))
     
-    # Define styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#EAB308'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
+    doc.build(elements)
+
+
+def invoice_flowables(invoice):
+    """
+    Build the ReportLab flowables of one invoice
+    """
+    # Container for the 'Flowable' objects
+    elements = []
     
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#CA8A04'),
-        spaceAfter=12,
-    )
+    styles = invoice_styles()
+    normal_style = styles['normal']
+    title_style = styles['title']
+    heading_style = styles['heading']
     
     # Hotel Header
     elements.append(Paragraph("HOTEL JAN", title_style))
-    elements.append(Paragraph("Talatona, Belas, Angola", styles['Normal']))
-    elements.append(Paragraph("Tel: +244 914 260 030", styles['Normal']))
-    elements.append(Paragraph("Email: reservas@hoteljan.co.ao", styles['Normal']))
+    elements.append(Paragraph("Talatona, Belas, Angola", normal_style))
+    elements.append(Paragraph("Tel: +244 914 260 030", normal_style))
+    elements.append(Paragraph("Email: reservas@hoteljan.co.ao", normal_style))
     elements.append(Spacer(1, 0.3*inch))
     
     # Invoice Title
     elements.append(Paragraph(f"FATURA / INVOICE", heading_style))
-    elements.append(Paragraph(f"Nº: {booking.booking_number}", styles['Normal']))
-    elements.append(Paragraph(f"Data: {datetime.now().strftime('%d/%m/%Y')}", styles['Normal']))
+    elements.append(Paragraph(f"Nº: {invoice['booking_number']}", normal_style))
+    elements.append(Paragraph(f"Data: {invoice['issue_date']}", normal_style))
     elements.append(Spacer(1, 0.3*inch))
     
     # Guest Information
     elements.append(Paragraph("DADOS DO HÓSPEDE / GUEST INFORMATION", heading_style))
     guest_data = [
-        ['Nome / Name:', booking.name],
-        ['Email:', booking.email],
-        ['Telefone / Phone:', booking.phone],
+        ['Nome / Name:', invoice['name']],
+        ['Email:', invoice['email']],
+        ['Telefone / Phone:', invoice['phone']],
     ]
     guest_table = Table(guest_data, colWidths=[2*inch, 4*inch])
     guest_table.setStyle(TableStyle([
@@ -213,13 +326,13 @@ def generate_invoice_pdf(booking):
     elements.append(Paragraph("DETALHES DA RESERVA / BOOKING DETAILS", heading_style))
     booking_data = [
         ['Descrição / Description', 'Quantidade / Qty', 'Preço / Price', 'Total'],
-        [booking.room.name, '', '', ''],
-        [f'Check-in: {booking.check_in.strftime("%d/%m/%Y")}', '', '', ''],
-        [f'Check-out: {booking.check_out.strftime("%d/%m/%Y")}', '', '', ''],
-        [f'{booking.nights} noites / nights', f'{booking.nights}', f'Kz {float(booking.room.price_per_night):,.2f}', f'Kz {booking.total_price:,.2f}'],
-        ['', '', 'Subtotal:', f'Kz {booking.total_price:,.2f}'],
+        [invoice['room_name'], '', '', ''],
+        [f'Check-in: {invoice["check_in"]}', '', '', ''],
+        [f'Check-out: {invoice["check_out"]}', '', '', ''],
+        [f'{invoice["nights"]} noites / nights', invoice['nights'], invoice['price_per_night'], invoice['total_price']],
+        ['', '', 'Subtotal:', invoice['total_price']],
         ['', '', 'Impostos (Incluídos):', 'Kz 0.00'],
-        ['', '', 'TOTAL:', f'Kz {booking.total_price:,.2f}'],
+        ['', '', 'TOTAL:', invoice['total_price']],
     ]
     
     booking_table = Table(booking_data, colWidths=[2.5*inch, 1*inch, 1.5*inch, 1.5*inch])
@@ -244,7 +357,7 @@ def generate_invoice_pdf(booking):
     
     # Payment Information
     elements.append(Paragraph("INFORMAÇÕES DE PAGAMENTO / PAYMENT INFORMATION", heading_style))
-    elements.append(Paragraph(f"Status: {booking.get_payment_status_display()}", styles['Normal']))
+    elements.append(Paragraph(f"Status: {invoice['payment_status']}", normal_style))
     elements.append(Spacer(1, 0.3*inch))
     
     # Terms and Conditions
@@ -255,35 +368,20 @@ def generate_invoice_pdf(booking):
     - Pequeno-almoço incluído / Breakfast included<br/>
     - Wi-Fi gratuito / Free Wi-Fi<br/>
     """
-    elements.append(Paragraph(terms, styles['Normal']))
+    elements.append(Paragraph(terms, normal_style))
     elements.append(Spacer(1, 0.5*inch))
     
     # Footer
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=colors.grey,
-        alignment=TA_CENTER
-    )
+    footer_style = styles['footer']
     elements.append(Paragraph("Obrigado por escolher o Hotel Jan! / Thank you for choosing Hotel Jan!", footer_style))
     elements.append(Paragraph("www.hoteljan.co.ao", footer_style))
     
-    # Build PDF
-    doc.build(elements)
-    
-    # Get the value of the BytesIO buffer
-    pdf = buffer.getvalue()
-    buffer.close()
-    
-    return pdf
+    return elements
 
 
 def calculate_booking_total(room, check_in, check_out):
     """
-    Calculate total price for booking
+    Calculate total price for booking (Decimal) from the room's rate plan
     """
-    nights = (check_out - check_in).days
-    total = nights * float(room.price_per_night)
-    return total
+    return quote_total(room, check_in, check_out)
 
@@ -1,54 +1,134 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse, FileResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django.db.models import Q
-from datetime import datetime, timedelta, date
+from django.utils.crypto import constant_time_compare
+from django.conf import settings
+from datetime import date
 from .models import Booking
-from .serializers import BookingSerializer, BookingListSerializer
-from .utils import send_booking_confirmation_email, generate_invoice_pdf
+from .bulk import import_bookings
+from .changes import update_bookings, changes_since, wait_for_changes
+from .serializers import (
+    BookingSerializer, BookingListSerializer, BOOKING_EXPORT_COLUMNS, fast_booking_data, iter_booking_data
+)
+from .utils import queue_booking_confirmation_email, get_invoice_pdf
+from .invoice_export import stream_invoice_zip, merged_invoice_pdf
+from .filters import filter_bookings
+from .pagination import BookingCursorPagination
+from hotel_api.streaming import EXPORT_CHUNK_SIZE, export_response, ndjson_lines
+from hotel_api.throttling import ActionThrottle
+from .availability import parse_availability_window, room_availability_data
 from rooms.models import Room
+from accounts.permissions import ActionCapabilities, Capability, request_capabilities
+
+
+def proves_ownership(request, booking):
+    """
+    Whether the request carries the booking's number and email (query
+    parameters, or the body of a POST)
+    """
+    def param(field):
+        value = request.query_params.get(field)
+        if value is None and hasattr(request.data, 'get'):
+            value = request.data.get(field)
+        return value.strip() if isinstance(value, str) else ''
+
+    number, email = param('booking_number').upper(), param('email').lower()
+    return bool(number and email) and (
+        constant_time_compare(number, booking.booking_number)
+        & constant_time_compare(email, booking.email.strip().lower())
+    )
 
 
 class BookingViewSet(viewsets.ModelViewSet):
     queryset = Booking.objects.all().select_related('room')
     serializer_class = BookingSerializer
+    pagination_class = BookingCursorPagination
+    permission_classes = [ActionCapabilities]
+    action_capabilities = {
+        'list': Capability.VIEW_BOOKINGS,
+        'upcoming': Capability.VIEW_BOOKINGS,
+        'export': Capability.VIEW_BOOKINGS,
+        'export_invoices': Capability.VIEW_BOOKINGS,
+        'changes': Capability.VIEW_BOOKINGS,
+        'update': Capability.MANAGE_BOOKINGS,
+        'partial_update': Capability.MANAGE_BOOKINGS,
+        'destroy': Capability.MANAGE_BOOKINGS,
+        'bulk': Capability.IMPORT_BOOKINGS,
+    }
+    # Guests may look up, cancel and download their own booking once they send its
+    # booking_number and email; holders of the capability skip that check
+    owner_actions = {
+        'retrieve': Capability.VIEW_BOOKINGS,
+        'invoice': Capability.VIEW_BOOKINGS,
+        'resend_confirmation': Capability.MANAGE_BOOKINGS,
+        'cancel': Capability.MANAGE_BOOKINGS,
+    }
+    throttle_classes = [ActionThrottle]
+    action_throttles = {'create': 'booking', 'resend_confirmation': 'resend_confirmation'}
     
     def get_serializer_class(self):
         if self.action == 'list':
             return BookingListSerializer
         return BookingSerializer
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            # Only load the columns BookingListSerializer and the cursor need
+            queryset = queryset.only(
+                'id', 'booking_number', 'name', 'check_in', 'check_out', 'status', 'total_price',
+                'created_at', 'room__name'
+            )
+        return queryset
+    
+    def get_object(self):
+        booking = super().get_object()
+        required = self.owner_actions.get(self.action)
+        if required and not request_capabilities(self.request) & required and not proves_ownership(self.request, booking):
+            # Same answer as a missing booking, so ids cannot be probed
+            raise NotFound()
+        return booking
+    
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list':
+            queryset = filter_bookings(queryset, self.request.query_params).order_by('-created_at', 'id')
+        return queryset
+    
     def perform_create(self, serializer):
-        """Create booking and send confirmation email"""
+        """Create booking and queue confirmation email"""
         booking = serializer.save()
         
-        # Send confirmation email
-        try:
-            email_sent = send_booking_confirmation_email(booking)
-            if email_sent:
-                booking.confirmation_email_sent = True
-                booking.save()
-        except Exception as e:
-            print(f"Error sending confirmation email: {e}")
+        # Delivered by send_queued_emails, which also sets confirmation_email_sent
+        queue_booking_confirmation_email(booking)
         
         return booking
     
     @action(detail=True, methods=['get'])
     def invoice(self, request, pk=None):
-        """Generate and download invoice PDF"""
+        """Download invoice PDF (cached by content hash, supports If-None-Match)"""
         booking = self.get_object()
         
         try:
-            pdf = generate_invoice_pdf(booking)
+            pdf, etag = get_invoice_pdf(booking)
             
-            # Mark invoice as generated
+            # Mark invoice as generated without re-saving the whole booking
             if not booking.invoice_generated:
-                booking.invoice_generated = True
-                booking.save()
+                update_bookings(Booking.objects.filter(pk=booking.pk), invoice_generated=True)
+            
+            not_modified = get_conditional_response(request, etag=quote_etag(etag))
+            if not_modified is not None:
+                return not_modified
             
             response = HttpResponse(pdf, content_type='application/pdf')
             response['Content-Disposition'] = f'attachment; filename="invoice_{booking.booking_number}.pdf"'
+            response['ETag'] = quote_etag(etag)
+            response['Cache-Control'] = 'private, no-cache'
             return response
         except Exception as e:
             return Response(
@@ -56,20 +136,89 @@ class BookingViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    @action(detail=False, methods=['get'])
+    def export_invoices(self, request):
+        """
+        Download invoices for many bookings at once
+        Query params: start_date, end_date (optional, filter on check-in),
+        status (optional, comma separated), room (optional), output ("zip" default, or "pdf" for one merged PDF)
+        """
+        bookings = filter_bookings(
+            Booking.objects.select_related('room'), request.query_params
+        ).order_by('check_in', 'id')
+        
+        output = request.query_params.get('output', 'zip')
+        if output == 'pdf':
+            response = FileResponse(merged_invoice_pdf(bookings), content_type='application/pdf')
+            response['Content-Disposition'] = 'attachment; filename="invoices.pdf"'
+            return response
+        if output != 'zip':
+            return Response({'error': 'output must be "zip" or "pdf"'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        response = StreamingHttpResponse(stream_invoice_zip(bookings), content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="invoices.zip"'
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every booking matching the list filters as CSV or NDJSON
+        Query params: start_date, end_date (optional, filter on check-in),
+        status (optional, comma separated), room (optional), output ("csv" default, or "ndjson")
+        """
+        bookings = filter_bookings(Booking.objects.all(), request.query_params).order_by('-created_at', 'id')
+        
+        response = export_response(
+            request.query_params.get('output', 'csv'), 'bookings', BOOKING_EXPORT_COLUMNS,
+            iter_booking_data(bookings, EXPORT_CHUNK_SIZE)
+        )
+        if response is None:
+            return Response({'error': 'output must be "csv" or "ndjson"'}, status=status.HTTP_400_BAD_REQUEST)
+        return response
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create many bookings at once (group blocks, corporate spreadsheets); all or nothing
+        Body: bookings (list of booking fields), defaults (optional fields shared by every row),
+        dry_run (optional, validate only), send_confirmation (optional, default true)
+        """
+        rows = request.data.get('bookings')
+        defaults = request.data.get('defaults') or {}
+        if not isinstance(rows, list) or not rows or not isinstance(defaults, dict):
+            return Response(
+                {'error': 'bookings must be a non-empty list and defaults an object'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        dry_run = request.data.get('dry_run') in (True, 'true', '1')
+        send_confirmation = request.data.get('send_confirmation', True) not in (False, 'false', '0')
+        bookings, errors, conflicts = import_bookings(rows, defaults, dry_run, send_confirmation)
+        
+        if errors or conflicts:
+            return Response({
+                'error': 'Nenhuma reserva foi criada.',
+                'errors': errors,
+                'conflicts': conflicts,
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if dry_run:
+            return Response({'valid': len(rows)})
+        
+        created = Booking.objects.filter(pk__in=[booking.pk for booking in bookings]).order_by('id')
+        return Response(
+            {'created': len(bookings), 'bookings': fast_booking_data(created)},
+            status=status.HTTP_201_CREATED
+        )
+    
     @action(detail=True, methods=['post'])
     def resend_confirmation(self, request, pk=None):
-        """Resend confirmation email"""
+        """Queue confirmation email again"""
         booking = self.get_object()
         
         try:
-            email_sent = send_booking_confirmation_email(booking)
-            if email_sent:
-                return Response({'message': 'Email de confirmação reenviado com sucesso!'})
-            else:
-                return Response(
-                    {'error': 'Erro ao enviar email'},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
+            queue_booking_confirmation_email(booking)
+            return Response({'message': 'Email de confirmação será reenviado em instantes!'})
         except Exception as e:
             return Response(
                 {'error': str(e)},
@@ -96,9 +245,8 @@ class BookingViewSet(viewsets.ModelViewSet):
         if not email:
             return Response({'error': 'Email parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
         
-        bookings = Booking.objects.filter(email=email).select_related('room')
-        serializer = self.get_serializer(bookings, many=True)
-        return Response(serializer.data)
+        bookings = Booking.objects.filter(email=email)
+        return Response(fast_booking_data(bookings))
     
     @action(detail=False, methods=['get'])
     def upcoming(self, request):
@@ -107,15 +255,46 @@ class BookingViewSet(viewsets.ModelViewSet):
         bookings = Booking.objects.filter(
             check_in__gte=today,
             status='confirmed'
-        ).select_related('room')
-        serializer = self.get_serializer(bookings, many=True)
-        return Response(serializer.data)
+        )
+        return Response(fast_booking_data(bookings, today))
+    
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Booking change feed, oldest first
+        Query params: since (last seen change id, default 0), limit (default 500, max 1000),
+        wait (optional long-poll seconds when nothing is new, capped at CHANGE_FEED_MAX_WAIT), stream ("ndjson" for one line per change)
+        """
+        params = request.query_params
+        try:
+            since = int(params.get('since', 0))
+            limit = min(int(params.get('limit', 500)), 1000)
+            wait = min(float(params.get('wait', 0)), getattr(settings, 'CHANGE_FEED_MAX_WAIT', 5))
+        except ValueError:
+            return Response({'error': 'Invalid since, limit or wait parameter'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if limit < 1:
+            return Response({'error': 'limit must be positive'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if wait > 0:
+            wait_for_changes(since, wait)
+        
+        changes = changes_since(since, limit)
+        next_since = changes[-1]['id'] if changes else since
+        
+        if params.get('stream') == 'ndjson':
+            return StreamingHttpResponse(
+                ndjson_lines(changes, [{'next_since': next_since}]), content_type='application/x-ndjson'
+            )
+        
+        return Response({'changes': changes, 'next_since': next_since})
     
     @action(detail=False, methods=['get'])
     def room_availability(self, request):
         """
         Get room-specific availability
-        Query params: room_id, start_date (optional), end_date (optional)
+        Query params: room_id, start_date (optional), end_date (optional),
+        compact (optional, "true" returns occupied/free ranges instead of unavailable_dates)
         """
         room_id = request.query_params.get('room_id')
         
@@ -131,15 +310,10 @@ class BookingViewSet(viewsets.ModelViewSet):
         start_date_str = request.query_params.get('start_date')
         end_date_str = request.query_params.get('end_date')
         
-        if start_date_str:
-            start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-        else:
-            start_date = date.today()
-        
-        if end_date_str:
-            end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-        else:
-            end_date = start_date + timedelta(days=90)
+        try:
+            start_date, end_date = parse_availability_window(start_date_str, end_date_str)
+        except ValueError:
+            return Response({'error': 'Invalid date format. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
         
         # Get all bookings for this room in the date range
         bookings = Booking.objects.filter(
@@ -149,20 +323,5 @@ class BookingViewSet(viewsets.ModelViewSet):
             status__in=['confirmed', 'pending']
         ).values('check_in', 'check_out', 'booking_number')
         
-        # Get all unavailable dates
-        unavailable_dates = []
-        for booking in bookings:
-            current_date = booking['check_in']
-            while current_date < booking['check_out']:
-                unavailable_dates.append(str(current_date))
-                current_date += timedelta(days=1)
-        
-        return Response({
-            'room_id': room.id,
-            'room_name': room.name,
-            'start_date': str(start_date),
-            'end_date': str(end_date),
-            'unavailable_dates': unavailable_dates,
-            'bookings': list(bookings),
-            'total_unavailable_days': len(set(unavailable_dates))
-        })
+        compact = request.query_params.get('compact') in ('1', 'true')
+        return Response(room_availability_data(room, start_date, end_date, list(bookings), compact))
@@ -1,7 +1,54 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, status, serializers
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from bookings.serializers import format_datetime
+from hotel_api.streaming import EXPORT_CHUNK_SIZE, export_response
+from hotel_api.throttling import ActionThrottle
+from accounts.permissions import ActionCapabilities, Capability
 from .models import ContactMessage
 from .serializers import ContactMessageSerializer
 
+CONTACT_EXPORT_COLUMNS = ['id', 'name', 'email', 'phone', 'message', 'created_at']
+
+
+def iter_contact_data(queryset, chunk_size):
+    """
+    ContactMessageSerializer output, one row at a time
+    """
+    tz = serializers.DateTimeField().default_timezone()
+    for row in queryset.values(*CONTACT_EXPORT_COLUMNS).iterator(chunk_size=chunk_size):
+        row['created_at'] = format_datetime(row['created_at'], tz)
+        yield row
+
+
 class ContactMessageViewSet(viewsets.ModelViewSet):
     queryset = ContactMessage.objects.all()
     serializer_class = ContactMessageSerializer
+    permission_classes = [ActionCapabilities]
+    # Anyone can send a message; reading the inbox is for staff
+    action_capabilities = {
+        'list': Capability.VIEW_MESSAGES,
+        'retrieve': Capability.VIEW_MESSAGES,
+        'update': Capability.VIEW_MESSAGES,
+        'partial_update': Capability.VIEW_MESSAGES,
+        'destroy': Capability.VIEW_MESSAGES,
+        'export': Capability.VIEW_MESSAGES,
+    }
+    throttle_classes = [ActionThrottle]
+    action_throttles = {'create': 'contact'}
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream every contact message as CSV or NDJSON
+        Query params: output ("csv" default, or "ndjson")
+        """
+        messages = self.filter_queryset(self.get_queryset()).order_by('id')
+        
+        response = export_response(
+            request.query_params.get('output', 'csv'), 'contact_messages', CONTACT_EXPORT_COLUMNS,
+            iter_contact_data(messages, EXPORT_CHUNK_SIZE)
+        )
+        if response is None:
+            return Response({'error': 'output must be "csv" or "ndjson"'}, status=status.HTTP_400_BAD_REQUEST)
+        return response
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class HotelApiConfig(AppConfig):
+    name = "hotel_api"
+
+    def ready(self):
+        from .database import apply_sqlite_pragmas
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid="sqlite_pragmas")
@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
+from .database import database_config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -37,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    "hotel_api",
     "rest_framework",
     "rest_framework.authtoken",
     "corsheaders",
@@ -45,6 +48,10 @@ INSTALLED_APPS = [
     "bookings",
     "rooms",
     "contact",
+    "notifications",
+    "pricing",
+    "ari",
+    "analytics",
 ]
 
 MIDDLEWARE = [
@@ -66,9 +73,14 @@ CORS_ALLOW_ALL_ORIGINS = True  # em produção restringir
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.AllowAny"],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "accounts.authentication.CachedTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
+    # Proxies in front of the app that append to X-Forwarded-For; the client IP
+    # (throttling) is the entry the outermost one added. PythonAnywhere has one;
+    # set NUM_PROXIES=0 when clients connect directly. Unset, DRF would trust the
+    # whole client-supplied header.
+    "NUM_PROXIES": int(os.environ.get('NUM_PROXIES', 1)),
 }
 
 TEMPLATES = [
@@ -92,13 +104,51 @@ WSGI_APPLICATION = 'hotel_api.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# DATABASE_URL selects SQLite (default) or PostgreSQL, see hotel_api/database.py
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_config(os.environ, BASE_DIR),
+}
+
+# Run on every new SQLite connection (writes already BEGIN IMMEDIATE, see database.py)
+#
+# journal_mode is stored in the database file itself, so it is only set when
+# SQLITE_JOURNAL_MODE is given (deployments: WAL). Left unset, the committed
+# development database keeps its rollback journal and manage.py leaves it untouched.
+SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', '').upper()
+SQLITE_PRAGMAS = {
+    # fsync at checkpoints instead of every commit; with WAL a crash cannot
+    # corrupt the file, a power cut may drop the last commits
+    'synchronous': 'NORMAL' if SQLITE_JOURNAL_MODE == 'WAL' else 'FULL',
+    'busy_timeout': 20000,  # ms to wait for the write lock before "database is locked"
+    'mmap_size': 256 * 1024 * 1024,  # read pages through a memory map
 }
+if SQLITE_JOURNAL_MODE:
+    # WAL: readers no longer block the writer (or each other). Needs every process
+    # on one host with shared memory: use DELETE if the file is on a network disk.
+    SQLITE_PRAGMAS = {'journal_mode': SQLITE_JOURNAL_MODE, **SQLITE_PRAGMAS}
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    # Shared by all worker processes, so signal-driven invalidation (room
+    # catalog) reaches every worker
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.django_cache',
+    },
+    # Rendered invoice PDFs keyed by content hash; bounded by MAX_ENTRIES
+    'invoices': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'invoices',
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {
+            'MAX_ENTRIES': 200,
+        },
+    },
+}
+# `manage.py test` swaps these for in-memory caches, see test_runner.py
+TEST_RUNNER = 'hotel_api.test_runner.TestRunner'
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -157,6 +207,59 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For developm
 DEFAULT_FROM_EMAIL = 'Hotel Jan <noreply@hoteljan.co.ao>'
 SERVER_EMAIL = 'server@hoteljan.co.ao'
 
+# Outbound email queue (drained by `python manage.py send_queued_emails`)
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BACKOFF = 60  # seconds, doubled after each failed attempt
+OUTBOX_LEASE = 300  # seconds a worker owns a claimed batch before another may retry it
+
+# Bulk invoice export (bookings/invoice_export.py): render processes forked from
+# the web worker (1 renders in-process) and renders kept in flight at once
+INVOICE_EXPORT_WORKERS = min(4, os.cpu_count() or 1)
+INVOICE_EXPORT_WINDOW = 8
+
+# Booking change feed: longest long-poll a client may request with ?wait=. Each
+# waiting request holds a sync worker thread, so keep it short; live clients
+# belong on the availability stream (ASGI) instead
+CHANGE_FEED_MAX_WAIT = 5  # seconds
+# Change-log rows (booking feed, ARI versions, analytics watermark) younger than
+# this are held back until any transaction holding a lower id has finished. Must
+# exceed the longest write transaction. SQLite commits ids in order: no delay.
+CHANGE_FEED_SETTLE = 0 if DATABASES['default']['ENGINE'].endswith('sqlite3') else 5  # seconds
+
+# Live availability stream (/api/availability/stream/, served through ASGI)
+# "local": in-process pub/sub, writers and streams share one process
+# "changefeed": each process tails the booking change feed (multi-worker setups)
+AVAILABILITY_BROKER = 'local'
+AVAILABILITY_BROKER_POLL_INTERVAL = 1  # seconds, changefeed backend only
+AVAILABILITY_STREAM_HEARTBEAT = 15  # seconds between keepalive comments
+AVAILABILITY_STREAM_QUEUE_SIZE = 100  # buffered events per connection before a resync
+
+# Analytics rollups: also refresh touched buckets right after each booking write
+# (otherwise run `python manage.py refresh_analytics` periodically); with a
+# CHANGE_FEED_SETTLE delay the refresh runs once the write has settled
+ANALYTICS_REFRESH_ON_COMMIT = False
+
+# Token authentication cache (accounts.authentication): token -> user snapshot
+AUTH_TOKEN_CACHE_TTL = 300  # seconds in the shared default cache
+AUTH_TOKEN_LOCAL_TTL = 5  # seconds in each process's LRU; bounds revocation lag in other workers
+AUTH_TOKEN_CACHE_SIZE = 1024  # tokens per process
+
+# Token-bucket throttling of public writes (hotel_api.throttling)
+# "local": buckets in each process; "cache": shared through THROTTLE_CACHE
+THROTTLE_BACKEND = 'local'
+THROTTLE_CACHE = 'default'
+THROTTLE_LOCAL_MAX_KEYS = 10000
+# Per scope: "ip" and/or request fields to bucket on, each "burst/period" (s, min, hour, day)
+THROTTLE_RATES = {
+    'login': {'ip': '20/min', 'username': '5/min'},
+    'register': {'ip': '5/hour'},
+    'forgot_password': {'ip': '5/hour', 'email': '3/hour'},
+    'reset_password': {'ip': '10/hour'},
+    'booking': {'ip': '30/hour', 'email': '10/hour'},
+    'resend_confirmation': {'ip': '10/hour'},
+    'contact': {'ip': '10/hour', 'email': '5/hour'},
+}
+
 # Frontend URL for password reset links
 FRONTEND_URL = 'https://hotel-jan.vercel.app'
 
@@ -0,0 +1,72 @@
+"""
+Helpers for streamed (chunked) API responses
+"""
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+# Rows fetched per database round trip by the export endpoints
+EXPORT_CHUNK_SIZE = 2000
+
+
+def ndjson_lines(*iterables):
+    """
+    Yield each item of the given iterables as one JSON line (NDJSON)
+    """
+    for iterable in iterables:
+        for item in iterable:
+            yield json.dumps(item, cls=DjangoJSONEncoder) + '\n'
+
+
+class Echo:
+    """
+    File-like object whose write() returns the line, for csv.writer
+    """
+    def write(self, value):
+        return value
+
+
+def csv_lines(columns, rows):
+    """
+    Yield a CSV header line, then one line per row dict
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([row[column] for column in columns])
+
+
+def buffered(lines, size=500):
+    """
+    Join lines into chunks of `size` so each write carries many rows.
+    The first line goes out alone, as soon as the first row is read.
+    """
+    lines = iter(lines)
+    for line in lines:
+        yield line
+        break
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def export_response(output, filename, columns, rows):
+    """
+    Stream row dicts as a CSV or NDJSON attachment.
+    Returns None for an unsupported output.
+    """
+    if output == 'csv':
+        lines, content_type = csv_lines(columns, rows), 'text/csv; charset=utf-8'
+    elif output == 'ndjson':
+        lines, content_type = ndjson_lines(rows), 'application/x-ndjson'
+    else:
+        return None
+    response = StreamingHttpResponse(buffered(lines), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{output}"'
+    return response
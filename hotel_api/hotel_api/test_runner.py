@@ -0,0 +1,33 @@
+"""
+Test runner for `python manage.py test`
+
+The default cache is a FileBasedCache shared with the running app (room
+catalog generations, token snapshots, throttle buckets), so tests that
+call cache.clear() would wipe it. The suite runs against in-memory caches
+instead.
+"""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests',
+    },
+    'invoices': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'test-invoices',
+    },
+}
+
+
+class TestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.test_caches = override_settings(CACHES=TEST_CACHES)
+        self.test_caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.test_caches.disable()
+        super().teardown_test_environment(**kwargs)
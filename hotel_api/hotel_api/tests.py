@@ -0,0 +1,59 @@
+from unittest import mock
+from django.test import TestCase, override_settings
+from .throttling import get_bucket_store
+
+LOGIN = '/api/auth/auth/login/'
+FORGOT_PASSWORD = '/api/auth/auth/forgot-password/'
+
+
+class ThrottleTests(TestCase):
+    """Token buckets on the public auth endpoints"""
+
+    def setUp(self):
+        get_bucket_store().clear()
+
+    def login(self, username='hospede', **headers):
+        return self.client.post(LOGIN, {'username': username, 'password': 'errada'}, headers=headers)
+
+    @override_settings(THROTTLE_RATES={'login': {'username': '2/min'}})
+    def test_empty_bucket_returns_429_with_retry_after(self):
+        self.assertEqual([self.login().status_code for _ in range(2)], [400, 400])
+
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        # One token refills in 30 seconds
+        self.assertTrue(0 < int(response['Retry-After']) <= 30)
+
+    @override_settings(THROTTLE_RATES={'login': {'username': '2/min'}})
+    def test_username_bucket(self):
+        for _ in range(2):
+            self.login()
+
+        self.assertEqual(self.login(' HOSPEDE ').status_code, 429)
+        self.assertEqual(self.login('outro').status_code, 400)
+
+    @override_settings(THROTTLE_RATES={'forgot_password': {'email': '1/hour'}})
+    def test_email_bucket(self):
+        self.client.post(FORGOT_PASSWORD, {'email': 'hospede@example.com'})
+
+        self.assertEqual(self.client.post(FORGOT_PASSWORD, {'email': 'Hospede@Example.com'}).status_code, 429)
+        self.assertEqual(self.client.post(FORGOT_PASSWORD, {'email': 'outro@example.com'}).status_code, 400)
+
+    @override_settings(THROTTLE_RATES={'login': {'ip': '1/min'}})
+    def test_rejection_happens_before_the_serializer(self):
+        self.login()
+
+        with mock.patch('accounts.views.LoginSerializer') as serializer:
+            self.assertEqual(self.login().status_code, 429)
+        serializer.assert_not_called()
+
+    @override_settings(THROTTLE_RATES={'login': {'ip': '2/min'}})
+    def test_spoofed_forwarded_for_shares_the_bucket(self):
+        # The proxy appends the address it saw; whatever the client sent comes first
+        statuses = [
+            self.login(x_forwarded_for=f'10.0.0.{i}, 203.0.113.7').status_code
+            for i in range(3)
+        ]
+        self.assertEqual(statuses, [400, 400, 429])
+
+        self.assertEqual(self.login(x_forwarded_for='10.0.0.1, 203.0.113.8').status_code, 400)
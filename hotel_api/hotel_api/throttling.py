@@ -0,0 +1,167 @@
+"""
+Token-bucket throttling for the public write endpoints
+
+Each scope (login, register, booking, ...) has buckets keyed by client IP
+and optionally by a request field such as the email, configured in
+THROTTLE_RATES:
+
+    THROTTLE_RATES = {'forgot_password': {'ip': '5/hour', 'email': '3/hour'}}
+
+"5/hour" is a bucket of 5 requests refilled evenly over an hour, so
+bursts up to the limit pass and the steady rate is capped. The checks run
+in DRF's initial(), before the view's serializer, password hasher or
+email queue, and a rejection (429 with Retry-After) only touches the
+bucket store.
+
+THROTTLE_BACKEND "local" keeps buckets in process memory; "cache" keeps
+them in a Django cache shared by all workers (THROTTLE_CACHE). The cache
+backend reads and writes without a lock, so concurrent requests from one
+client may slip a few extra requests through.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """
+    "10/min" -> (capacity 10, refill 10/60 tokens per second)
+    """
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+def refill(state, now, capacity, per_second):
+    """
+    Take one token from the bucket `state` (tokens, timestamp) or None.
+    Returns the new state and the seconds to wait (0 when a token was taken).
+    """
+    tokens, stamp = state if state else (capacity, now)
+    tokens = min(capacity, tokens + max(0, now - stamp) * per_second)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / per_second
+
+
+class LocalBucketStore:
+    """
+    Buckets in process memory, least recently used evicted past max_keys
+    """
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, per_second):
+        with self._lock:
+            state, wait = refill(self._buckets.get(key), time.monotonic(), capacity, per_second)
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Buckets in a shared Django cache; an idle bucket expires once it
+    would be full again
+    """
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def consume(self, key, capacity, per_second):
+        state, wait = refill(self.cache.get(key), time.time(), capacity, per_second)
+        self.cache.set(key, state, int(capacity / per_second) + 1)
+        return wait
+
+    def clear(self):
+        self.cache.clear()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_bucket_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                backend = getattr(settings, 'THROTTLE_BACKEND', 'local')
+                if backend == 'local':
+                    _store = LocalBucketStore(getattr(settings, 'THROTTLE_LOCAL_MAX_KEYS', 10000))
+                elif backend == 'cache':
+                    _store = CacheBucketStore(getattr(settings, 'THROTTLE_CACHE', 'default'))
+                else:
+                    raise ImproperlyConfigured(f"Unknown THROTTLE_BACKEND {backend!r}")
+    return _store
+
+
+def request_field(request, field):
+    try:
+        value = request.data.get(field)
+    except AttributeError:
+        return None
+    return value.strip().lower() if isinstance(value, str) else None
+
+
+class BucketThrottle(BaseThrottle):
+    """
+    Consume one token from every bucket configured for `scope`; the
+    first empty bucket rejects the request
+    """
+    scope = None
+
+    def get_scope(self, view):
+        return self.scope
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        scope = self.get_scope(view)
+        rates = getattr(settings, 'THROTTLE_RATES', {}).get(scope) if scope else None
+        if not rates:
+            return True
+
+        store = get_bucket_store()
+        for field, rate in rates.items():
+            ident = self.get_ident(request) if field == 'ip' else request_field(request, field)
+            if not ident:
+                continue
+            digest = hashlib.sha256(ident.encode()).hexdigest()[:32]
+            wait = store.consume(f"throttle:{scope}:{field}:{digest}", *parse_rate(rate))
+            if wait:
+                self.retry_after = wait
+                return False
+        return True
+
+    def wait(self):
+        return self.retry_after
+
+
+def throttle(scope):
+    """
+    A BucketThrottle subclass for `scope`, for throttle_classes
+    """
+    return type(f'{scope.title().replace("_", "")}Throttle', (BucketThrottle,), {'scope': scope})
+
+
+class ActionThrottle(BucketThrottle):
+    """
+    For ViewSets: `action_throttles` maps action names to a scope;
+    unlisted actions are not throttled
+    """
+    def get_scope(self, view):
+        return getattr(view, 'action_throttles', {}).get(view.action)
@@ -7,4 +7,7 @@ urlpatterns = [
     path("api/", include("rooms.urls")),
     path("api/", include("bookings.urls")),
     path("api/", include("contact.urls")),
+    path("api/", include("pricing.urls")),
+    path("api/", include("ari.urls")),
+    path("api/", include("analytics.urls")),
 ]
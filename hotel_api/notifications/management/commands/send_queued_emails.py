@@ -0,0 +1,22 @@
+import time
+from django.core.management.base import BaseCommand
+from notifications.outbox import send_queued_emails
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbound emails in batches, retrying failures with backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help="Emails sent per SMTP connection")
+        parser.add_argument('--loop', action='store_true', help="Keep polling the outbox instead of exiting when it is empty")
+        parser.add_argument('--interval', type=float, default=5, help="Seconds to sleep between polls in --loop mode")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_queued_emails(batch_size=options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+            if sent + failed < options['batch_size']:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
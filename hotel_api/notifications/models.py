@@ -0,0 +1,42 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboundEmail(models.Model):
+    """
+    Outbox row for an email that is sent by the send_queued_emails worker
+    instead of inside the request that produced it
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pendente'),
+        ('sent', 'Enviado'),
+        ('failed', 'Falhou'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    from_email = models.CharField(max_length=255)
+    to_email = models.EmailField()
+    body = models.TextField(blank=True, default='')
+    html_body = models.TextField(blank=True, default='')
+
+    # Booking whose confirmation_email_sent flag is set once delivered
+    booking = models.ForeignKey(
+        'bookings.Booking', on_delete=models.SET_NULL, null=True, blank=True, related_name='emails'
+    )
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
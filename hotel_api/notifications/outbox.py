@@ -0,0 +1,138 @@
+"""
+Database-backed email outbox
+
+Request handlers only insert OutboundEmail rows; the send_queued_emails
+management command drains them in batches over one SMTP connection.
+"""
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import F
+from django.utils import timezone
+from .models import OutboundEmail
+
+
+def outbound_email(subject, to_email, body='', html_body='', booking=None, from_email=None):
+    """
+    Build an unsaved OutboundEmail
+    """
+    return OutboundEmail(
+        subject=subject,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to_email=to_email,
+        body=body,
+        html_body=html_body,
+        booking=booking,
+    )
+
+
+def enqueue_email(subject, to_email, body='', html_body='', booking=None, from_email=None):
+    """
+    Queue an email for the outbox worker
+    """
+    email = outbound_email(subject, to_email, body, html_body, booking, from_email)
+    email.save()
+    return email
+
+
+def enqueue_emails(emails):
+    """
+    Queue many outbound_email() messages with one insert
+    """
+    return OutboundEmail.objects.bulk_create(emails, batch_size=500)
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        email.subject, email.body, email.from_email, [email.to_email], connection=connection
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    return message
+
+
+def retry_delay(attempts):
+    """
+    Exponential backoff: OUTBOX_RETRY_BACKOFF seconds doubled per failed attempt
+    """
+    base = getattr(settings, 'OUTBOX_RETRY_BACKOFF', 60)
+    return timedelta(seconds=base * 2 ** (attempts - 1))
+
+
+def claim_batch(batch_size):
+    """
+    Lease up to batch_size due emails to this worker by pushing their
+    next_attempt_at to a lease expiry only this call uses. The conditional
+    UPDATE only wins rows still due, so concurrent workers never get the
+    same email; rows of a worker that dies are retried once the lease ends.
+    """
+    now = timezone.now()
+    candidates = list(
+        OutboundEmail.objects.filter(status='pending', next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'id').values_list('id', flat=True)[:batch_size]
+    )
+    if not candidates:
+        return []
+    lease = now + timedelta(seconds=getattr(settings, 'OUTBOX_LEASE', 300), microseconds=uuid.uuid4().int % 1000000)
+    OutboundEmail.objects.filter(id__in=candidates, status='pending', next_attempt_at__lte=now).update(
+        next_attempt_at=lease
+    )
+    return list(OutboundEmail.objects.filter(id__in=candidates, next_attempt_at=lease).order_by('id'))
+
+
+def send_queued_emails(batch_size=50):
+    """
+    Send one batch of due emails over a single connection.
+    Returns (sent, failed) counts.
+    """
+    from bookings.changes import update_bookings
+    from bookings.models import Booking
+
+    max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    delivered = []
+    failed = []
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        # Server unreachable: back the whole batch off and keep going; an
+        # outage never marks queued emails as failed
+        for email in batch:
+            email.attempts += 1
+            email.last_error = str(e)
+            email.next_attempt_at = timezone.now() + retry_delay(min(email.attempts, max_attempts))
+        OutboundEmail.objects.bulk_update(batch, ['attempts', 'last_error', 'next_attempt_at'])
+        return 0, len(batch)
+
+    try:
+        for email in batch:
+            try:
+                build_message(email, connection).send()
+                delivered.append(email)
+            except Exception as e:
+                email.attempts += 1
+                email.last_error = str(e)
+                if email.attempts >= max_attempts:
+                    email.status = 'failed'
+                else:
+                    email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+                failed.append(email)
+    finally:
+        connection.close()
+
+    sent_at = timezone.now()
+    OutboundEmail.objects.filter(id__in=[email.id for email in delivered]).update(
+        status='sent', sent_at=sent_at, attempts=F('attempts') + 1
+    )
+    OutboundEmail.objects.bulk_update(failed, ['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+    booking_ids = {email.booking_id for email in delivered if email.booking_id}
+    if booking_ids:
+        update_bookings(Booking.objects.filter(id__in=booking_ids), confirmation_email_sent=True)
+
+    return len(delivered), len(failed)
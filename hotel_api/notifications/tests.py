@@ -0,0 +1,123 @@
+import threading
+import uuid
+from datetime import date, timedelta
+from smtplib import SMTPException
+from unittest import mock
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from bookings.models import Booking, BookingChange
+from rooms.models import Room
+from .models import OutboundEmail
+from .outbox import claim_batch, enqueue_email, send_queued_emails
+
+
+class UnreachableBackend(BaseEmailBackend):
+    def open(self):
+        raise ConnectionRefusedError("Connection refused")
+
+
+class RejectingBackend(BaseEmailBackend):
+    def send_messages(self, messages):
+        raise SMTPException("550 mailbox unavailable")
+
+
+def queue(count, booking=None):
+    return [enqueue_email(f"Assunto {i}", f"hospede{i}@example.com", "Olá", booking=booking) for i in range(count)]
+
+
+class SendQueuedEmailsTests(TestCase):
+
+    def test_delivers_and_flags_bookings(self):
+        room = Room.objects.create(name="Quarto", room_type="standard", description="Teste", price_per_night=100)
+        check_in = date.today() + timedelta(days=10)
+        bookings = [
+            Booking.objects.create(room=room, name='Hóspede', email='a@example.com', check_in=check_in + timedelta(days=3 * i),
+                                   check_out=check_in + timedelta(days=3 * i + 2), status='confirmed')
+            for i in range(2)
+        ]
+        queue(2, bookings[0])
+        queue(1, bookings[1])
+        queue(1)
+        changes = BookingChange.objects.count()
+
+        self.assertEqual(send_queued_emails(), (4, 0))
+
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(set(OutboundEmail.objects.values_list('status', 'attempts')), {('sent', 1)})
+        self.assertEqual(Booking.objects.filter(confirmation_email_sent=True).count(), 2)
+        # One bulk update, recorded on the change feed like any booking write
+        self.assertEqual(BookingChange.objects.count(), changes + 2)
+        self.assertEqual(send_queued_emails(), (0, 0))
+
+    @override_settings(EMAIL_BACKEND='notifications.tests.UnreachableBackend', OUTBOX_RETRY_BACKOFF=60)
+    def test_unreachable_server_backs_off_the_batch(self):
+        queue(3)
+
+        self.assertEqual(send_queued_emails(), (0, 3))
+
+        for email in OutboundEmail.objects.all():
+            self.assertEqual((email.status, email.attempts), ('pending', 1))
+            self.assertIn("Connection refused", email.last_error)
+            self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        # Nothing is due until the backoff ends
+        self.assertEqual(send_queued_emails(), (0, 0))
+
+    @override_settings(EMAIL_BACKEND='notifications.tests.RejectingBackend', OUTBOX_MAX_ATTEMPTS=2)
+    def test_rejected_email_fails_after_max_attempts(self):
+        email, = queue(1)
+
+        self.assertEqual(send_queued_emails(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('pending', 1))
+        self.assertIn("550", email.last_error)
+
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_queued_emails(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('failed', 2))
+
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_queued_emails(), (0, 0))
+
+    def test_claims_do_not_overlap(self):
+        queue(5)
+
+        first, second = claim_batch(3), claim_batch(3)
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertFalse({email.id for email in first} & {email.id for email in second})
+        self.assertEqual(claim_batch(3), [])
+
+
+class ConcurrentClaimTests(TransactionTestCase):
+
+    def test_racing_workers_never_share_a_row(self):
+        queue(5)
+        barrier = threading.Barrier(2)
+        new_lease = uuid.uuid4
+        results = [None, None]
+
+        def lease_after_both_read():
+            # Both workers have read the same candidates before either leases them
+            barrier.wait(timeout=5)
+            return new_lease()
+
+        def worker(index):
+            try:
+                results[index] = {email.id for email in claim_batch(5)}
+            finally:
+                connection.close()
+
+        with mock.patch('notifications.outbox.uuid.uuid4', side_effect=lease_after_both_read):
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertFalse(results[0] & results[1])
+        self.assertEqual(results[0] | results[1], set(OutboundEmail.objects.values_list('id', flat=True)))
@@ -0,0 +1,18 @@
+from django.contrib import admin
+from .models import RatePlan, RateCalendar, LengthOfStayDiscount
+
+
+class RateCalendarInline(admin.TabularInline):
+    model = RateCalendar
+    extra = 0
+
+
+class LengthOfStayDiscountInline(admin.TabularInline):
+    model = LengthOfStayDiscount
+    extra = 0
+
+
+@admin.register(RatePlan)
+class RatePlanAdmin(admin.ModelAdmin):
+    list_display = ['name', 'room_type', 'is_active', 'weekend_multiplier', 'version']
+    inlines = [RateCalendarInline, LengthOfStayDiscountInline]
@@ -0,0 +1,141 @@
+"""
+Rate-plan pricing engine
+
+A quote covers the nights [check_in, check_out). Nightly rates are taken
+from the active plan's month rows by slicing each month's rate array once,
+so pricing a stay costs a fixed number of queries whatever its length and
+is done entirely in Decimal.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from .models import RatePlan, RateCalendar
+
+CENTS = Decimal('0.01')
+WEEKEND = (4, 5)  # Friday and Saturday nights
+QUOTE_TIMEOUT = 60 * 60
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def active_plans(room_types):
+    """
+    Active plan per room type (one query)
+    """
+    plans = RatePlan.objects.filter(room_type__in=set(room_types), is_active=True)
+    return {plan.room_type: plan for plan in plans}
+
+
+def load_calendars(plans, check_in, check_out):
+    """
+    {(plan_id, month): rates} for every month the stay touches (one query)
+    """
+    rows = RateCalendar.objects.filter(
+        rate_plan__in=plans,
+        month__gte=month_start(check_in),
+        month__lt=check_out,
+    ).values_list('rate_plan_id', 'month', 'rates')
+    return {(plan_id, month): rates for plan_id, month, rates in rows}
+
+
+def nightly_rates(room, plan, calendars, check_in, check_out):
+    """
+    Base rate of every night in the stay, before weekend and stay adjustments
+    """
+    base = Decimal(room.price_per_night)
+    rates = []
+    current = check_in
+    while current < check_out:
+        # Slice the month's rate array for the part of the stay inside it
+        end = min(next_month(current), check_out)
+        month_rates = calendars.get((plan.id, month_start(current)), []) if plan else []
+        window = month_rates[current.day - 1:current.day - 1 + (end - current).days]
+        window = window + [None] * ((end - current).days - len(window))
+        rates.extend(base if rate is None else Decimal(rate) for rate in window)
+        current = end
+    return rates
+
+
+def stay_rates(room, plan, calendars, check_in, check_out):
+    """
+    Final nightly rates (weekend multiplier applied, rounded to cents)
+    """
+    rates = nightly_rates(room, plan, calendars, check_in, check_out)
+    if plan and plan.weekend_multiplier != 1:
+        first_weekday = check_in.weekday()
+        rates = [
+            rate * plan.weekend_multiplier if (first_weekday + i) % 7 in WEEKEND else rate
+            for i, rate in enumerate(rates)
+        ]
+    return [rate.quantize(CENTS) for rate in rates]
+
+
+def price_stay(room, plan, calendars, check_in, check_out):
+    rates = stay_rates(room, plan, calendars, check_in, check_out)
+    subtotal = sum(rates, Decimal('0.00'))
+
+    discount_percent = Decimal('0')
+    if plan:
+        eligible = [d.percent for d in plan.discounts.all() if d.min_nights <= len(rates)]
+        discount_percent = max(eligible, default=Decimal('0'))
+    discount = (subtotal * discount_percent / 100).quantize(CENTS)
+
+    return {
+        'room_id': room.id,
+        'check_in': str(check_in),
+        'check_out': str(check_out),
+        'nights': len(rates),
+        'nightly_rates': [str(rate) for rate in rates],
+        'subtotal': str(subtotal),
+        'discount_percent': str(discount_percent),
+        'discount': str(discount),
+        'total': str(subtotal - discount),
+        'rate_plan': plan.id if plan else None,
+        'rate_plan_version': plan.version if plan else None,
+    }
+
+
+def quote_cache_key(room, plan, check_in, check_out):
+    plan_key = f"{plan.id}.{plan.version}" if plan else 'base'
+    return f"pricing:quote:{room.id}:{room.price_per_night}:{check_in}:{check_out}:{plan_key}"
+
+
+def quote_rooms(rooms, check_in, check_out):
+    """
+    Quote several rooms for one stay. Returns {room_id: quote}; cached quotes
+    are keyed by room, its base price, the dates and the rate plan version.
+    """
+    rooms = list(rooms)
+    plans = active_plans(room.room_type for room in rooms)
+    keys = {room.id: quote_cache_key(room, plans.get(room.room_type), check_in, check_out) for room in rooms}
+    cached = cache.get_many(keys.values())
+
+    quotes = {}
+    missing = [room for room in rooms if keys[room.id] not in cached]
+    if missing:
+        prefetch_related_objects(list(plans.values()), 'discounts')
+        calendars = load_calendars(plans.values(), check_in, check_out)
+        fresh = {}
+        for room in missing:
+            quote = price_stay(room, plans.get(room.room_type), calendars, check_in, check_out)
+            fresh[keys[room.id]] = quote
+        cache.set_many(fresh, QUOTE_TIMEOUT)
+        cached.update(fresh)
+
+    for room in rooms:
+        quotes[room.id] = cached[keys[room.id]]
+    return quotes
+
+
+def quote_total(room, check_in, check_out):
+    """
+    Total price of a stay in one room, as a Decimal
+    """
+    return Decimal(quote_rooms([room], check_in, check_out)[room.id]['total'])
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatePlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('room_type', models.CharField(choices=[('standard', 'Quarto Standard'), ('deluxe', 'Quarto Deluxe'), ('suite', 'Suite Presidencial')], max_length=20)),
+                ('is_active', models.BooleanField(default=True)),
+                ('weekend_multiplier', models.DecimalField(decimal_places=2, default=1, max_digits=5)),
+                ('version', models.PositiveIntegerField(default=1, editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('room_type',), name='one_active_rate_plan_per_room_type')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RateCalendar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('rates', models.JSONField(default=list)),
+                ('rate_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='months', to='pricing.rateplan')),
+            ],
+            options={
+                'ordering': ['rate_plan', 'month'],
+                'constraints': [models.UniqueConstraint(fields=('rate_plan', 'month'), name='unique_rate_plan_month')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LengthOfStayDiscount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_nights', models.PositiveIntegerField()),
+                ('percent', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('rate_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='discounts', to='pricing.rateplan')),
+            ],
+            options={
+                'ordering': ['rate_plan', 'min_nights'],
+                'constraints': [models.UniqueConstraint(fields=('rate_plan', 'min_nights'), name='unique_rate_plan_min_nights')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+from django.db import models
+from django.db.models import Q
+from rooms.models import Room
+
+
+class RatePlan(models.Model):
+    """
+    Nightly pricing for one room type. Nights without a calendar rate fall
+    back to the room's price_per_night. `version` increases on every change
+    to the plan, its calendar or its discounts and keys cached quotes.
+    """
+    name = models.CharField(max_length=100)
+    room_type = models.CharField(max_length=20, choices=Room.ROOM_TYPES)
+    is_active = models.BooleanField(default=True)
+
+    # Applied to Friday and Saturday nights
+    weekend_multiplier = models.DecimalField(max_digits=5, decimal_places=2, default=1)
+
+    version = models.PositiveIntegerField(default=1, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['room_type'], condition=Q(is_active=True), name='one_active_rate_plan_per_room_type'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_room_type_display()})"
+
+
+class RateCalendar(models.Model):
+    """
+    Compact rate calendar: one row per plan and month, with `rates[i]` the
+    rate (decimal string) for day i + 1, or null to use the room price
+    """
+    rate_plan = models.ForeignKey(RatePlan, on_delete=models.CASCADE, related_name="months")
+    month = models.DateField(help_text="First day of the month")
+    rates = models.JSONField(default=list)
+
+    class Meta:
+        ordering = ['rate_plan', 'month']
+        constraints = [
+            models.UniqueConstraint(fields=['rate_plan', 'month'], name='unique_rate_plan_month'),
+        ]
+
+    def __str__(self):
+        return f"{self.rate_plan} - {self.month:%Y-%m}"
+
+
+class LengthOfStayDiscount(models.Model):
+    rate_plan = models.ForeignKey(RatePlan, on_delete=models.CASCADE, related_name="discounts")
+    min_nights = models.PositiveIntegerField()
+    percent = models.DecimalField(max_digits=5, decimal_places=2)
+
+    class Meta:
+        ordering = ['rate_plan', 'min_nights']
+        constraints = [
+            models.UniqueConstraint(fields=['rate_plan', 'min_nights'], name='unique_rate_plan_min_nights'),
+        ]
+
+    def __str__(self):
+        return f"{self.rate_plan} - {self.min_nights}+ noites: {self.percent}%"
@@ -0,0 +1,22 @@
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import RatePlan, RateCalendar, LengthOfStayDiscount
+
+
+@receiver(pre_save, sender=RatePlan)
+def bump_plan_version(sender, instance, **kwargs):
+    if instance.pk:
+        instance.version = F('version') + 1
+
+
+@receiver(post_save, sender=RatePlan)
+def reload_plan_version(sender, instance, **kwargs):
+    if not isinstance(instance.version, int):
+        instance.refresh_from_db(fields=['version'])
+
+
+@receiver([post_save, post_delete], sender=RateCalendar)
+@receiver([post_save, post_delete], sender=LengthOfStayDiscount)
+def bump_parent_plan_version(sender, instance, **kwargs):
+    RatePlan.objects.filter(pk=instance.rate_plan_id).update(version=F('version') + 1)
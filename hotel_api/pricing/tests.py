@@ -0,0 +1,107 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.test import TestCase
+from bookings.utils import calculate_booking_total
+from rooms.models import Room
+from .engine import quote_rooms, quote_total
+from .models import RatePlan, RateCalendar, LengthOfStayDiscount
+from .views import MAX_NIGHTS
+
+# Thursday 30 January to Monday 3 February 2025: Thu, Fri, Sat, Sun nights
+CHECK_IN = date(2025, 1, 30)
+CHECK_OUT = date(2025, 2, 3)
+
+
+def month_rates(**days):
+    """A 31-slot rate array with the given {dayN: rate} entries, null elsewhere"""
+    rates = [None] * 31
+    for key, rate in days.items():
+        rates[int(key[3:]) - 1] = rate
+    return rates
+
+
+class QuoteTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.room = Room.objects.create(
+            name="Quarto Standard", room_type="standard", description="Teste", price_per_night=Decimal('100.00')
+        )
+        self.plan = RatePlan.objects.create(name="Tarifa", room_type="standard")
+
+    def quote(self, check_in=CHECK_IN, check_out=CHECK_OUT):
+        return quote_rooms([self.room], check_in, check_out)[self.room.id]
+
+    def test_stay_across_months_slices_each_calendar(self):
+        RateCalendar.objects.create(rate_plan=self.plan, month=date(2025, 1, 1), rates=month_rates(day30='120.00', day31='130.00'))
+        RateCalendar.objects.create(rate_plan=self.plan, month=date(2025, 2, 1), rates=month_rates(day1='140.00', day2='150.00'))
+
+        quote = self.quote()
+
+        self.assertEqual(quote['nightly_rates'], ['120.00', '130.00', '140.00', '150.00'])
+        self.assertEqual(quote['total'], '540.00')
+
+    def test_null_and_missing_rates_fall_back_to_room_price(self):
+        RateCalendar.objects.create(rate_plan=self.plan, month=date(2025, 1, 1), rates=month_rates(day31='130.00'))
+        # February has a short array: nights past its end use the room price too
+        RateCalendar.objects.create(rate_plan=self.plan, month=date(2025, 2, 1), rates=[None])
+
+        self.assertEqual(self.quote()['nightly_rates'], ['100.00', '130.00', '100.00', '100.00'])
+
+    def test_weekend_multiplier_applies_to_friday_and_saturday(self):
+        self.plan.weekend_multiplier = Decimal('1.50')
+        self.plan.save()
+
+        self.assertEqual(self.quote()['nightly_rates'], ['100.00', '150.00', '150.00', '100.00'])
+
+    def test_largest_eligible_discount_wins(self):
+        LengthOfStayDiscount.objects.create(rate_plan=self.plan, min_nights=2, percent=Decimal('5'))
+        LengthOfStayDiscount.objects.create(rate_plan=self.plan, min_nights=3, percent=Decimal('10'))
+        LengthOfStayDiscount.objects.create(rate_plan=self.plan, min_nights=7, percent=Decimal('20'))
+
+        quote = self.quote()
+
+        self.assertEqual(Decimal(quote['discount_percent']), Decimal('10'))
+        self.assertEqual(quote['discount'], '40.00')
+        self.assertEqual(quote['total'], '360.00')
+
+    def test_amounts_are_rounded_to_cents(self):
+        self.room.price_per_night = Decimal('33.33')
+        self.room.save()
+        self.plan.weekend_multiplier = Decimal('1.25')
+        self.plan.save()
+        LengthOfStayDiscount.objects.create(rate_plan=self.plan, min_nights=4, percent=Decimal('12.5'))
+
+        quote = self.quote()
+
+        # 33.33 * 1.25 = 41.6625 per weekend night
+        self.assertEqual(quote['nightly_rates'], ['33.33', '41.66', '41.66', '33.33'])
+        self.assertEqual(quote['subtotal'], '149.98')
+        self.assertEqual(quote['discount'], '18.75')
+        self.assertEqual(quote['total'], '131.23')
+        self.assertEqual(calculate_booking_total(self.room, CHECK_IN, CHECK_OUT), Decimal('131.23'))
+
+    def test_rate_changes_invalidate_cached_quotes(self):
+        calendar = RateCalendar.objects.create(rate_plan=self.plan, month=date(2025, 1, 1), rates=month_rates(day30='120.00'))
+        self.assertEqual(quote_total(self.room, CHECK_IN, CHECK_OUT), Decimal('420.00'))
+        version = RatePlan.objects.get(pk=self.plan.pk).version
+
+        calendar.rates = month_rates(day30='200.00')
+        calendar.save()
+        self.assertGreater(RatePlan.objects.get(pk=self.plan.pk).version, version)
+        self.assertEqual(quote_total(self.room, CHECK_IN, CHECK_OUT), Decimal('500.00'))
+
+        LengthOfStayDiscount.objects.create(rate_plan=self.plan, min_nights=4, percent=Decimal('10'))
+        self.assertEqual(quote_total(self.room, CHECK_IN, CHECK_OUT), Decimal('450.00'))
+
+    def test_quote_endpoint_caps_the_stay(self):
+        def get(check_out):
+            return self.client.get('/api/pricing/quote/', {'check_in': '2025-01-01', 'check_out': check_out,
+                                                           'rooms': self.room.id})
+
+        response = get(str(date(2025, 1, 1) + timedelta(days=MAX_NIGHTS)))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['quotes'][0]['nightly_rates']), MAX_NIGHTS)
+        self.assertEqual(get(str(date(2025, 1, 1) + timedelta(days=MAX_NIGHTS + 1))).status_code, 400)
+        self.assertEqual(get('2226-01-01').status_code, 400)
@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('pricing/quote/', views.quote, name='pricing-quote'),
+]
@@ -0,0 +1,46 @@
+from rest_framework import status, permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from datetime import datetime
+from rooms.models import Room
+from .engine import quote_rooms
+
+# Each night is a rate per room in the response and quotes are cached per date
+# range, so open-ended stays are refused
+MAX_NIGHTS = 365
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def quote(request):
+    """
+    Price one stay for many rooms
+    Query params: check_in, check_out, rooms (optional, comma separated ids; default all rooms)
+    """
+    try:
+        check_in = datetime.strptime(request.query_params['check_in'], '%Y-%m-%d').date()
+        check_out = datetime.strptime(request.query_params['check_out'], '%Y-%m-%d').date()
+    except KeyError:
+        return Response({'error': 'check_in and check_out parameters are required'}, status=status.HTTP_400_BAD_REQUEST)
+    except ValueError:
+        return Response({'error': 'Dates must use the YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if check_in >= check_out:
+        return Response({'error': 'check_out must be after check_in'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if (check_out - check_in).days > MAX_NIGHTS:
+        return Response({'error': f'A stay can be at most {MAX_NIGHTS} nights'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    rooms = Room.objects.all()
+    if request.query_params.get('rooms'):
+        try:
+            rooms = rooms.filter(id__in=[int(i) for i in request.query_params['rooms'].split(',')])
+        except ValueError:
+            return Response({'error': 'rooms must be a comma separated list of ids'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    quotes = quote_rooms(rooms.order_by('id'), check_in, check_out)
+    return Response({
+        'check_in': str(check_in),
+        'check_out': str(check_out),
+        'quotes': list(quotes.values()),
+    })
@@ -0,0 +1,22 @@
+"""
+Async read path for the room list (see RoomViewSet.list)
+"""
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from .catalog import aget_catalog
+
+
+async def room_list(request):
+    """Room catalog from cache, revalidated with ETag / Last-Modified"""
+    catalog = await aget_catalog()
+    etag = quote_etag(catalog['etag'])
+    last_modified = int(catalog['last_modified'].timestamp())
+    
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = JsonResponse(catalog['data'], safe=False)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'public, no-cache'
+    return response
@@ -0,0 +1,75 @@
+"""
+Cached room catalog
+
+The public room list is served from Django's cache. Every Room or
+RoomImage write bumps a generation token (see signals.py), so the next
+request rebuilds the catalog under a new key and a rebuild racing with a
+write can never resurrect stale data.
+"""
+import hashlib
+import json
+import uuid
+from django.core.cache import cache
+from django.utils import timezone
+from .models import Room
+from .serializers import fast_room_data, afast_room_data
+
+GENERATION_KEY = 'rooms:catalog:generation'
+CATALOG_TIMEOUT = 60 * 60
+
+
+def current_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = {'token': uuid.uuid4().hex, 'changed_at': timezone.now()}
+        cache.add(GENERATION_KEY, generation, None)
+        generation = cache.get(GENERATION_KEY, generation)
+    return generation
+
+
+def build_catalog(data, generation):
+    payload = json.dumps(data, sort_keys=True).encode()
+    return {
+        'data': data,
+        'etag': hashlib.sha256(payload).hexdigest(),
+        'last_modified': generation['changed_at'],
+    }
+
+
+def get_catalog():
+    """
+    Return {'data', 'etag', 'last_modified'} for the room list
+    """
+    generation = current_generation()
+    key = f"rooms:catalog:{generation['token']}"
+    catalog = cache.get(key)
+    if catalog is None:
+        catalog = build_catalog(fast_room_data(Room.objects.all()), generation)
+        cache.set(key, catalog, CATALOG_TIMEOUT)
+    return catalog
+
+
+async def acurrent_generation():
+    generation = await cache.aget(GENERATION_KEY)
+    if generation is None:
+        generation = {'token': uuid.uuid4().hex, 'changed_at': timezone.now()}
+        await cache.aadd(GENERATION_KEY, generation, None)
+        generation = await cache.aget(GENERATION_KEY, generation)
+    return generation
+
+
+async def aget_catalog():
+    """
+    get_catalog for async views
+    """
+    generation = await acurrent_generation()
+    key = f"rooms:catalog:{generation['token']}"
+    catalog = await cache.aget(key)
+    if catalog is None:
+        catalog = build_catalog(await afast_room_data(Room.objects.all()), generation)
+        await cache.aset(key, catalog, CATALOG_TIMEOUT)
+    return catalog
+
+
+def invalidate_catalog():
+    cache.set(GENERATION_KEY, {'token': uuid.uuid4().hex, 'changed_at': timezone.now()}, None)
@@ -12,3 +12,44 @@ class RoomSerializer(serializers.ModelSerializer):
     class Meta:
         model = Room
         fields = ['id', 'name', 'room_type', 'description', 'price_per_night', 'image', 'images']
+
+
+# Fast read path: exact RoomSerializer output from two .values() queries
+# (rooms, then all their images) instead of one image query per room.
+_decimal_field = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+ROOM_VALUE_FIELDS = ['id', 'name', 'room_type', 'description', 'price_per_night', 'image']
+
+
+def room_rows_data(rooms, image_rows):
+    images = {room['id']: [] for room in rooms}
+    for image in image_rows:
+        images[image.pop('room_id')].append(image)
+
+    for room in rooms:
+        room['price_per_night'] = _decimal_field.to_representation(room['price_per_night'])
+        room['images'] = images[room['id']]
+    return rooms
+
+
+def room_images(room_ids):
+    return RoomImage.objects.filter(room_id__in=room_ids).values(
+        'room_id', 'id', 'image_url', 'alt_text', 'order'
+    )
+
+
+def fast_room_data(queryset):
+    """
+    Read-only equivalent of RoomSerializer(queryset, many=True).data
+    """
+    rooms = list(queryset.values(*ROOM_VALUE_FIELDS))
+    return room_rows_data(rooms, room_images([room['id'] for room in rooms]))
+
+
+async def afast_room_data(queryset):
+    """
+    fast_room_data for async views, using the async ORM
+    """
+    rooms = [room async for room in queryset.values(*ROOM_VALUE_FIELDS)]
+    image_rows = [image async for image in room_images([room['id'] for room in rooms])]
+    return room_rows_data(rooms, image_rows)
@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .catalog import invalidate_catalog
+from .models import Room, RoomImage
+
+
+@receiver([post_save, post_delete], sender=Room)
+@receiver([post_save, post_delete], sender=RoomImage)
+def room_catalog_changed(sender, **kwargs):
+    # Invalidate now and again after commit, so a request that rebuilds the
+    # catalog before the transaction commits cannot keep uncommitted-era data
+    invalidate_catalog()
+    transaction.on_commit(invalidate_catalog)
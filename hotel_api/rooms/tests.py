@@ -1,3 +1,114 @@
+from datetime import date, timedelta
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from bookings.models import Booking
+from .models import Room, RoomImage
 
-# Create your tests here.
+
+class RoomCatalogTests(TestCase):
+    """The cached room list: invalidation by generation token and ETag revalidation"""
+
+    paths = ['/api/rooms/', '/api/async/rooms/']
+
+    def setUp(self):
+        cache.clear()
+        self.room = Room.objects.create(
+            name="Quarto Deluxe", room_type="deluxe", description="Teste", price_per_night=150000
+        )
+        self.image = RoomImage.objects.create(room=self.room, image_url="https://example.com/1.jpg", order=0)
+
+    def get(self, path, **headers):
+        if path.startswith('/api/async/'):
+            return async_to_sync(self.async_client.get)(path, headers=headers)
+        return self.client.get(path, headers=headers)
+
+    def test_room_save_changes_etag(self):
+        for path in self.paths:
+            etag = self.get(path)['ETag']
+            self.room.price_per_night += 1000
+            self.room.save()
+
+            response = self.get(path, if_none_match=etag)
+            self.assertEqual(response.status_code, 200, path)
+            self.assertNotEqual(response['ETag'], etag, path)
+
+    def test_image_delete_changes_etag(self):
+        etags = [self.get(path)['ETag'] for path in self.paths]
+        self.image.delete()
+
+        for path, etag in zip(self.paths, etags):
+            response = self.get(path)
+            self.assertNotEqual(response['ETag'], etag, path)
+            self.assertEqual(response.json()[0]['images'], [])
+
+    def test_if_none_match_returns_304(self):
+        for path in self.paths:
+            etag = self.get(path)['ETag']
+
+            response = self.get(path, if_none_match=etag)
+            self.assertEqual(response.status_code, 304, path)
+            self.assertEqual(response['ETag'], etag, path)
+
+    def test_query_count_is_fixed(self):
+        with CaptureQueriesContext(connection) as cold:
+            self.get(self.paths[0])
+        cache.clear()
+        for i in range(5):
+            room = Room.objects.create(name=f"Quarto {i}", room_type="standard", description="Teste", price_per_night=100)
+            RoomImage.objects.create(room=room, image_url=f"https://example.com/{i}.jpg", order=0)
+
+        with self.assertNumQueries(len(cold)):
+            self.get(self.paths[0])
+        # Warm cache: served without touching the database
+        for path in self.paths:
+            with self.assertNumQueries(0):
+                self.assertEqual(self.get(path).status_code, 200)
+
+
+class AvailableRoomsTests(TestCase):
+    """GET /api/rooms/available/: one anti-join against RoomNight for every room"""
+
+    def setUp(self):
+        self.check_in = date.today() + timedelta(days=30)
+        self.room = self.add_room("Quarto 0")
+
+    def add_room(self, name):
+        room = Room.objects.create(name=name, room_type="standard", description="Teste", price_per_night=100)
+        RoomImage.objects.create(room=room, image_url="https://example.com/1.jpg", order=0)
+        return room
+
+    def book(self, room, status):
+        return Booking.objects.create(room=room, name='Hóspede', email='a@example.com', check_in=self.check_in,
+                                      check_out=self.check_in + timedelta(days=3), status=status)
+
+    def available(self):
+        response = self.client.get('/api/rooms/available/', {
+            'check_in': str(self.check_in + timedelta(days=1)), 'check_out': str(self.check_in + timedelta(days=2)),
+        })
+        self.assertEqual(response.status_code, 200)
+        return [room['id'] for room in response.json()['rooms']]
+
+    def test_query_count_does_not_grow_with_rooms(self):
+        # Room search plus the image prefetch
+        with self.assertNumQueries(2):
+            self.assertEqual(self.available(), [self.room.id])
+
+        rooms = [self.add_room(f"Quarto {i}") for i in range(1, 6)]
+        self.book(rooms[0], 'confirmed')
+
+        with self.assertNumQueries(2):
+            self.assertEqual(sorted(self.available()), sorted(room.id for room in [self.room, *rooms[1:]]))
+
+    def test_only_bookings_holding_nights_block_a_room(self):
+        self.book(self.room, 'cancelled')
+        self.assertEqual(self.available(), [self.room.id])
+
+        booking = self.book(self.room, 'pending')
+        self.assertEqual(self.available(), [])
+
+        booking.status = 'cancelled'
+        booking.save()
+        self.assertEqual(self.available(), [self.room.id])
@@ -1,7 +1,12 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 from .views import RoomViewSet
+from . import async_views
 
 router = DefaultRouter()
 router.register(r"rooms", RoomViewSet)
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    # Async read path (served through hotel_api.asgi)
+    path("async/rooms/", async_views.room_list, name="async-room-list"),
+]
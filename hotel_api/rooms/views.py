@@ -1,7 +1,72 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from django.db.models import Exists, OuterRef
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from datetime import datetime
+from bookings.models import RoomNight
 from .models import Room
 from .serializers import RoomSerializer
+from .catalog import get_catalog
+from accounts.permissions import ActionCapabilities, Capability
 
 class RoomViewSet(viewsets.ModelViewSet):
-    queryset = Room.objects.all()
+    queryset = Room.objects.prefetch_related('images')
     serializer_class = RoomSerializer
+    permission_classes = [ActionCapabilities]
+    action_capabilities = {
+        'create': Capability.MANAGE_ROOMS,
+        'update': Capability.MANAGE_ROOMS,
+        'partial_update': Capability.MANAGE_ROOMS,
+        'destroy': Capability.MANAGE_ROOMS,
+    }
+
+    def list(self, request, *args, **kwargs):
+        """Room catalog from cache, revalidated with ETag / Last-Modified"""
+        catalog = get_catalog()
+        etag = quote_etag(catalog['etag'])
+        last_modified = int(catalog['last_modified'].timestamp())
+        
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = Response(catalog['data'])
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'public, no-cache'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def available(self, request):
+        """
+        Search all rooms that are free for a date range
+        Query params: check_in, check_out, guests (optional)
+        """
+        try:
+            check_in = datetime.strptime(request.query_params['check_in'], '%Y-%m-%d').date()
+            check_out = datetime.strptime(request.query_params['check_out'], '%Y-%m-%d').date()
+            guests = int(request.query_params.get('guests', 1))
+        except KeyError:
+            return Response({'error': 'check_in and check_out parameters are required'}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            return Response({'error': 'Invalid date or guests format'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if check_in >= check_out:
+            return Response({'error': 'check_out must be after check_in'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Same limit as BookingSerializer.validate; rooms have no individual capacity
+        if guests < 1 or guests > 6:
+            return Response({'error': 'guests must be between 1 and 6'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Anti-join against the occupancy table: one query for all rooms
+        taken = RoomNight.objects.filter(room=OuterRef('pk'), night__gte=check_in, night__lt=check_out)
+        rooms = Room.objects.filter(~Exists(taken)).prefetch_related('images')
+        
+        serializer = self.get_serializer(rooms, many=True)
+        return Response({
+            'check_in': str(check_in),
+            'check_out': str(check_out),
+            'guests': guests,
+            'nights': (check_out - check_in).days,
+            'rooms': serializer.data,
+        })